@@ -1,92 +1,159 @@
 import boto3
+import os
 import time
 import random
 from concurrent.futures import ThreadPoolExecutor
 import threading
+from botocore.config import Config
 
-# Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
+num_threads = 200  # Adjust based on your needs
+
+# Client settings shared by the scan and benchmark workers
+config = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    connect_timeout=2,
+    read_timeout=5,  # Fail fast and retry instead of waiting out the 60s default
+    tcp_keepalive=True
+)
+
+# Optional DAX cluster endpoint (dax://...); reads go straight to DynamoDB when unset
+DAX_ENDPOINT = os.environ.get('DAX_ENDPOINT')
+
+# Each worker thread owns its client, so it only needs a few connections
+worker_config = config.merge(Config(max_pool_connections=4))
+
+# Initialize DynamoDB table (used for its name)
+dynamodb = boto3.resource('dynamodb', region_name='us-east-1', config=config)
 table = dynamodb.Table('mydemo')
-client = boto3.client('dynamodb', region_name='us-east-1')
 
-# List to hold oneids
-oneids = []
+# Thread-local storage for per-thread DynamoDB clients
+thread_local = threading.local()
 
-# Shared variables for tracking total queries and items
-total_queries = 0
-total_items = 0
-total_errors = 0
+# Guards the set of scanned oneids while the scan segments add to it
 lock = threading.Lock()
 
-def scan_table(target_size=1000000):
-    print("Scanning table...")
+def oneid_key(oneid):
+    return {'oneid': {'S': oneid}}
+
+def scan_segment(segment, total_segments, target_size, stop_event, seen):
+    # Each segment worker gets its own session; boto3 resources aren't thread-safe
+    session = boto3.session.Session()
+    segment_table = session.resource('dynamodb', region_name='us-east-1', config=config).Table(table.name)
     scan_kwargs = {
         'ProjectionExpression': 'oneid',
-        'Limit': 1000
+        'Limit': 1000,
+        'TotalSegments': total_segments,
+        'Segment': segment
     }
     last_evaluated_key = None
 
-    while len(oneids) < target_size:
+    while not stop_event.is_set():
         if last_evaluated_key:
             scan_kwargs['ExclusiveStartKey'] = last_evaluated_key
 
-        response = table.scan(**scan_kwargs)
-        oneids.extend([item['oneid'] for item in response['Items']])
+        response = segment_table.scan(**scan_kwargs)
+        with lock:
+            seen.update(item['oneid'] for item in response['Items'])
+            if len(seen) >= target_size:
+                stop_event.set()
         last_evaluated_key = response.get('LastEvaluatedKey')
 
         if not last_evaluated_key:
             break
 
-    # Remove duplicates while preserving order
-    oneids[:] = list(dict.fromkeys(oneids))
-    print(f"Scan complete. Total unique oneids: {len(oneids)}")
+def scan_table(target_size=1000000, total_segments=16):
+    print(f"Scanning table with {total_segments} parallel segments...")
+    stop_event = threading.Event()
+    # Deduplicate while scanning; sampling order doesn't matter
+    seen = set()
+
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        futures = [executor.submit(scan_segment, segment, total_segments, target_size, stop_event, seen)
+                   for segment in range(total_segments)]
+        for future in futures:
+            future.result()
+
+    # Build each BatchGetItem key once here instead of on every request
+    oneid_keys = tuple(map(oneid_key, seen))
+    print(f"Scan complete. Total unique oneids: {len(oneid_keys)}")
+    return oneid_keys
+
+def get_client():
+    # A per-thread session avoids contending on botocore's shared session state
+    if not hasattr(thread_local, 'client'):
+        if DAX_ENDPOINT:
+            # Only needed when benchmarking through DAX: pip install amazon-dax-client
+            from amazondax import AmazonDaxClient
+            thread_local.client = AmazonDaxClient(endpoint_url=DAX_ENDPOINT, region_name='us-east-1')
+        else:
+            session = boto3.session.Session()
+            thread_local.client = session.client('dynamodb', region_name='us-east-1', config=worker_config)
+    return thread_local.client
 
 def query_batch(batch_size=100):
-    global total_queries, total_items, total_errors
-    batch = random.sample(oneids, min(batch_size, len(oneids)))
+    # Sample without replacement: BatchGetItem rejects duplicate keys in one request
+    batch = random.sample(oneid_keys, min(batch_size, len(oneid_keys)))
     try:
-        response = client.batch_get_item(
+        response = get_client().batch_get_item(
             RequestItems={
                 table.name: {
-                    'Keys': [{'oneid': {'S': oneid}} for oneid in batch],
+                    'Keys': batch,
                     'ProjectionExpression': 'oneid'
                 }
             }
         )
-        with lock:
-            total_queries += len(batch)
-            total_items += len(response['Responses'][table.name])
+        return len(batch), len(response['Responses'][table.name]), 0
     except Exception as e:
-        with lock:
-            total_errors += len(batch)
         print(f"Error in batch query: {str(e)}")
+        return 0, 0, len(batch)
+
+def worker(stop_event, ready):
+    # Create this thread's client and open its connection before the timed run starts
+    query_batch()
+    ready.wait()
+
+    # Counters stay local to the thread and are summed once the run ends
+    queries = items = errors = 0
+    while not stop_event.is_set():
+        batch_queries, batch_items, batch_errors = query_batch()
+        queries += batch_queries
+        items += batch_items
+        errors += batch_errors
+    return queries, items, errors
 
 def run_benchmark(duration, num_threads):
+    stop_event = threading.Event()
+    ready = threading.Barrier(num_threads + 1)
     with ThreadPoolExecutor(max_workers=num_threads) as executor:
-        end_time = time.time() + duration
-        while time.time() < end_time:
-            futures = [executor.submit(query_batch) for _ in range(num_threads)]
-            for future in futures:
-                future.result()
+        futures = [executor.submit(worker, stop_event, ready) for _ in range(num_threads)]
+
+        # Start timing once every worker has warmed up its connection
+        ready.wait()
+        start_time = time.time()
+        time.sleep(duration)
+        stop_event.set()
+        results = [future.result() for future in futures]
+        total_time = time.time() - start_time
+
+    total_queries = sum(result[0] for result in results)
+    total_items = sum(result[1] for result in results)
+    total_errors = sum(result[2] for result in results)
+    return total_queries, total_items, total_errors, total_time
 
 # Scan the table first
-scan_table()
+oneid_keys = scan_table()
 
-if not oneids:
+if not oneid_keys:
     print("No oneids found. Exiting.")
     exit()
 
 # Run benchmark
 print("Starting benchmark...")
-num_threads = 200  # Adjust based on your needs
 duration = 600  # 10 minutes
 
-start_time = time.time()
-run_benchmark(duration, num_threads)
-end_time = time.time()
+total_queries, total_items, total_errors, total_time = run_benchmark(duration, num_threads)
 
 # Calculate and print results
-total_time = end_time - start_time
 requests_per_second = total_queries / total_time
 
 print(f"\nBenchmark completed:")
@@ -1,21 +1,47 @@
 import boto3
+import os
 import time
 import random
-import uuid
+from botocore.config import Config
 from botocore.exceptions import ClientError
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+
+# Possible values for each generated attribute
+BLOCKS = [
+    "downtown_block_1", "downtown_block_2", "residential_zone_a",
+    "industrial_area_b", "commercial_district_c", "suburban_area_d",
+    "historic_district_e", "waterfront_zone_f", "university_campus_g",
+    "park_area_h"
+]
+STATUSES = ["active", "inactive", "under_construction", "maintenance", "planned"]
+VERSION_NUMBERS = [str(v) for v in range(1, 101)]  # Versions 1-100, stored as strings
+
+# Optional DAX cluster endpoint (dax://...); writes go through it so the cache stays warm
+DAX_ENDPOINT = os.environ.get('DAX_ENDPOINT')
 
 class MapBulkLoader:
     """Class to handle bulk loading of map elements into DynamoDB"""
 
-    def __init__(self, region='us-east-1', table_name='map'):
+    def __init__(self, region='us-east-1', table_name='map', max_workers=10):
         """Initialize the DynamoDB client and set table name"""
         self.dynamodb = boto3.resource('dynamodb', region_name=region)
         self.table = self.dynamodb.Table(table_name)
         self.table_name = table_name
 
-        # For direct batch writing
-        self.dynamodb_client = boto3.client('dynamodb', region_name=region)
+        # For direct batch writing; size the pool to the worker count so connections are reused
+        config = Config(
+            retries={'max_attempts': 10, 'mode': 'adaptive'},
+            connect_timeout=2,
+            read_timeout=5,  # Fail fast and retry instead of waiting out the 60s default
+            max_pool_connections=max_workers,
+            tcp_keepalive=True
+        )
+        if DAX_ENDPOINT:
+            # Only needed when writing through DAX: pip install amazon-dax-client
+            from amazondax import AmazonDaxClient
+            self.dynamodb_client = AmazonDaxClient(endpoint_url=DAX_ENDPOINT, region_name=region)
+        else:
+            self.dynamodb_client = boto3.client('dynamodb', region_name=region, config=config)
 
     def generate_random_geolocation(self):
         """Generate a random geolocation (latitude, longitude)"""
@@ -26,22 +52,11 @@ class MapBulkLoader:
 
     def generate_random_map_element(self, index):
         """Generate a random map element with realistic data including multiple versions"""
-        # Define possible values for each attribute
-        blocks = [
-            "downtown_block_1", "downtown_block_2", "residential_zone_a",
-            "industrial_area_b", "commercial_district_c", "suburban_area_d",
-            "historic_district_e", "waterfront_zone_f", "university_campus_g",
-            "park_area_h"
-        ]
-
-        statuses = ["active", "inactive", "under_construction", "maintenance", "planned"]
-
         # Generate a unique element ID
-        ele_id = f"element_{index}_{uuid.uuid4().hex[:8]}"
+        ele_id = f"element_{index}_{os.urandom(4).hex()}"
 
         # Select a block based on index to ensure some elements share the same block
-        block_index = index % len(blocks)
-        block = blocks[block_index]
+        block = BLOCKS[index % len(BLOCKS)]
 
         # Generate base timestamp (slightly in the past)
         base_timestamp = int(time.time() * 1000) - random.randint(0, 10000)
@@ -49,26 +64,22 @@ class MapBulkLoader:
         # Determine number of versions for this element (1-5)
         num_versions = random.randint(1, 5)
 
+        # Draw version numbers and statuses for all versions in one call each
+        version_nums = random.choices(VERSION_NUMBERS, k=num_versions)
+        statuses = random.choices(STATUSES, k=num_versions)
+
         # Generate multiple versions of the element
         versions = []
         for v_idx in range(num_versions):
-            # Generate random version as integer between 1 and 100, but store as string
-            version_num = str(random.randint(1, 100))
-
             # Each version has its own timestamp, status, attitude, and geolocation
-            version_timestamp = base_timestamp - (num_versions - v_idx) * 86400000  # 1 day earlier per version
-            status = random.choice(statuses)
-            attitude = round(random.uniform(0, 1000), 2)
-            geolocation = self.generate_random_geolocation()
-
             version_data = {
                 'ele': ele_id,
-                'timestamp': version_timestamp,
+                'timestamp': base_timestamp - (num_versions - v_idx) * 86400000,  # 1 day earlier per version
                 'block': block,
-                'version': version_num,  # Now a string
-                'status': status,
-                'attitude': attitude,
-                'geolocation': geolocation
+                'version': version_nums[v_idx],  # Now a string
+                'status': statuses[v_idx],
+                'attitude': round(random.uniform(0, 1000), 2),
+                'geolocation': self.generate_random_geolocation()
             }
             versions.append(version_data)
 
@@ -79,14 +90,14 @@ class MapBulkLoader:
         max_retries = 5
         retry_count = 0
 
+        # Convert items to DynamoDB format once; retries resend the unprocessed requests as-is
+        request_items = {
+            self.table_name: [{'PutRequest': {'Item': self._convert_to_dynamodb_format(item)}}
+                             for item in items_batch]
+        }
+
         while retry_count < max_retries:
             try:
-                # Convert items to DynamoDB format
-                request_items = {
-                    self.table_name: [{'PutRequest': {'Item': self._convert_to_dynamodb_format(item)}}
-                                     for item in items_batch]
-                }
-
                 response = self.dynamodb_client.batch_write_item(RequestItems=request_items)
 
                 # Check for unprocessed items
@@ -95,8 +106,7 @@ class MapBulkLoader:
                     return True
 
                 # If there are unprocessed items, retry with those items
-                items_batch = [self._convert_from_dynamodb_format(item['PutRequest']['Item'])
-                              for item in unprocessed]
+                request_items = {self.table_name: unprocessed}
 
                 # Exponential backoff
                 wait_time = (2 ** retry_count) * 100  # milliseconds
@@ -112,37 +122,34 @@ class MapBulkLoader:
                 if retry_count >= max_retries:
                     return False
 
-        print(f"Failed to write {len(items_batch)} items after {max_retries} retries")
+        print(f"Failed to write {len(request_items[self.table_name])} items after {max_retries} retries")
         return False
 
     def _convert_to_dynamodb_format(self, item):
-        """Convert a Python dict to DynamoDB format"""
-        dynamodb_item = {}
-        for key, value in item.items():
-            if isinstance(value, str):
-                dynamodb_item[key] = {'S': value}
-            elif isinstance(value, int):
-                dynamodb_item[key] = {'N': str(value)}
-            elif isinstance(value, float):
-                dynamodb_item[key] = {'N': str(value)}
-            # Add more type conversions as needed
-        return dynamodb_item
-
-    def _convert_from_dynamodb_format(self, dynamodb_item):
-        """Convert from DynamoDB format back to Python dict"""
-        item = {}
-        for key, value_dict in dynamodb_item.items():
-            value_type = list(value_dict.keys())[0]
-            if value_type == 'S':
-                item[key] = value_dict['S']
-            elif value_type == 'N':
-                # Try to convert to int if possible, otherwise float
-                try:
-                    item[key] = int(value_dict['N'])
-                except ValueError:
-                    item[key] = float(value_dict['N'])
-            # Add more type conversions as needed
-        return item
+        """Convert a map element version to DynamoDB format"""
+        # The element schema is fixed, so map each attribute directly without type checks
+        return {
+            'ele': {'S': item['ele']},
+            'timestamp': {'N': str(item['timestamp'])},
+            'block': {'S': item['block']},
+            'version': {'S': item['version']},
+            'status': {'S': item['status']},
+            'attitude': {'N': str(item['attitude'])},
+            'geolocation': {'S': item['geolocation']}
+        }
+
+    def generate_batches(self, count, batch_size):
+        """Yield batches of map element versions as they are generated (max 25 items per batch for DynamoDB)"""
+        batch = []
+        for i in range(count):
+            for version_data in self.generate_random_map_element(i):
+                batch.append(version_data)
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+
+        if batch:
+            yield batch
 
     def insert_bulk_data(self, count=10000, batch_size=25, max_workers=10):
         """
@@ -159,32 +166,39 @@ class MapBulkLoader:
         start_time = time.time()
         print(f"Starting bulk insert of {count} elements with multiple versions...")
 
-        # Generate all items first (each element may have multiple versions)
-        all_versions = []
-        for i in range(count):
-            element_versions = self.generate_random_map_element(i)
-            all_versions.extend(element_versions)
-
-        total_items = len(all_versions)
-        print(f"Generated {total_items} total items for {count} elements")
-
-        # Split into batches (max 25 items per batch for DynamoDB)
-        batches = [all_versions[i:i+batch_size] for i in range(0, len(all_versions), batch_size)]
+        # Generate batches lazily so generation overlaps with the writes already in flight
+        batches = self.generate_batches(count, batch_size)
 
         success_count = 0
         failure_count = 0
 
-        # Process batches in parallel
+        # Maps each in-flight future to the number of items in its batch
+        in_flight = {}
+
+        def record_result(future):
+            """Count the items of a finished batch as succeeded or failed"""
+            nonlocal success_count, failure_count
+            batch_size_actual = in_flight.pop(future)
+            if future.result():
+                success_count += batch_size_actual
+            else:
+                failure_count += batch_size_actual
+
+        # Process batches in parallel, keeping at most max_workers * 2 batches in flight
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            results = list(executor.map(self.batch_write_with_retries, batches))
+            for batch in batches:
+                if len(in_flight) >= max_workers * 2:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record_result(future)
+
+                in_flight[executor.submit(self.batch_write_with_retries, batch)] = len(batch)
 
-            # Count successes and failures
-            for i, result in enumerate(results):
-                batch_size_actual = len(batches[i])
-                if result:
-                    success_count += batch_size_actual
-                else:
-                    failure_count += batch_size_actual
+            for future in as_completed(list(in_flight)):
+                record_result(future)
+
+        total_items = success_count + failure_count
+        print(f"Generated {total_items} total items for {count} elements")
 
         end_time = time.time()
         duration = end_time - start_time
@@ -212,7 +226,7 @@ def main():
     args = parser.parse_args()
 
     # Initialize the loader
-    loader = MapBulkLoader(region=args.region, table_name=args.table)
+    loader = MapBulkLoader(region=args.region, table_name=args.table, max_workers=args.workers)
 
     # Insert the data
     loader.insert_bulk_data(
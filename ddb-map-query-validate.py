@@ -1,8 +1,76 @@
 import boto3
-from boto3.dynamodb.conditions import Key
+import functools
+import os
 import time
 import argparse
 import json
+import sys
+
+# Only the attributes the results are built from
+PROJECTION_EXPRESSION = '#e, #v, #b, #s, #t'
+PROJECTION_NAMES = {'#e': 'ele', '#v': 'version', '#b': 'block', '#s': 'status', '#t': 'timestamp'}
+
+# Block/version key condition on the GSI, written out once instead of
+# rebuilding and re-serializing Key() conditions for every page
+KEY_CONDITION_EXPRESSION = '#b = :block AND #v <= :max_version'
+
+# Block-only key condition, for when the version has to be compared in Python
+BLOCK_CONDITION_EXPRESSION = '#b = :block'
+
+# Optional DAX cluster endpoint (dax://...); queries go straight to DynamoDB when unset
+DAX_ENDPOINT = os.environ.get('DAX_ENDPOINT')
+
+@functools.lru_cache(maxsize=None)
+def _table(region, table_name):
+    """Return a cached Table resource so repeated calls skip client and credential setup"""
+    if DAX_ENDPOINT:
+        # Only needed when querying through DAX: pip install amazon-dax-client
+        from amazondax import AmazonDaxClient
+        return AmazonDaxClient.resource(endpoint_url=DAX_ENDPOINT, region_name=region).Table(table_name)
+    return boto3.resource('dynamodb', region_name=region).Table(table_name)
+
+def query_items(table, **query_kwargs):
+    """
+    Yield the items of a query page by page, following LastEvaluatedKey
+    so callers can stop early without fetching the remaining pages.
+    """
+    response = table.query(**query_kwargs)
+    yield from response.get('Items', [])
+    
+    while 'LastEvaluatedKey' in response:
+        response = table.query(ExclusiveStartKey=response['LastEvaluatedKey'], **query_kwargs)
+        yield from response.get('Items', [])
+
+def count_items(table, **query_kwargs):
+    """Sum the Count of a Select='COUNT' query across pages, without transferring any items"""
+    response = table.query(Select='COUNT', **query_kwargs)
+    count = response['Count']
+    
+    while 'LastEvaluatedKey' in response:
+        response = table.query(Select='COUNT', ExclusiveStartKey=response['LastEvaluatedKey'], **query_kwargs)
+        count += response['Count']
+    
+    return count
+
+def version_at_most(item, max_version):
+    """Compare a String-typed version numerically, skipping values that aren't integers"""
+    try:
+        return int(item['version']) <= max_version
+    except ValueError:
+        return False
+
+@functools.lru_cache(maxsize=None)
+def version_attribute_type(region, table_name):
+    """
+    Return the declared DynamoDB type ('N' or 'S') of the 'version' attribute,
+    read from the table's attribute definitions (DAX has no DescribeTable, so
+    this always asks DynamoDB)
+    """
+    response = boto3.client('dynamodb', region_name=region).describe_table(TableName=table_name)
+    for definition in response['Table']['AttributeDefinitions']:
+        if definition['AttributeName'] == 'version':
+            return definition['AttributeType']
+    return 'N'
 
 def query_gsi(block_value='downtown_block_2', max_version=20, table_name='map', 
               index_name='block-version-index', region='us-east-1', limit=100):
@@ -15,93 +83,67 @@ def query_gsi(block_value='downtown_block_2', max_version=20, table_name='map',
     - table_name: DynamoDB table name
     - index_name: GSI name
     - region: AWS region
-    - limit: Number of items to display
+    - limit: Number of items to display; 0 only counts the matching items
     
     Returns:
-    - Total count of items and the first 'limit' items
+    - The matching items, or an empty list when only counting
     """
-    # Initialize DynamoDB client
-    dynamodb = boto3.resource('dynamodb', region_name=region)
-    table = dynamodb.Table(table_name)
+    table = _table(region, table_name)
     
     start_time = time.time()
     print(f"Querying GSI '{index_name}' for block='{block_value}' with version <= {max_version}")
     
-    # Convert max_version to both string and number for flexibility
-    max_version_str = str(max_version)
-    max_version_num = max_version
-    
-    # We'll try both string and number types for version to handle the schema mismatch
-    try:
-        # First attempt with version as number
-        response = table.query(
-            IndexName=index_name,
-            KeyConditionExpression=Key('block').eq(block_value) & Key('version').lte(max_version_num),
-            ScanIndexForward=False  # This gives us descending order by version
+    # A String sort key compares lexicographically, so '#v <= :max_version' with '20'
+    # would skip '3'..'9' and match '100'. In that case only the block goes into the
+    # key condition and every version is checked numerically here
+    version_is_string = version_attribute_type(region, table_name) == 'S'
+    if version_is_string:
+        query_kwargs = {
+            'IndexName': index_name,
+            'KeyConditionExpression': BLOCK_CONDITION_EXPRESSION,
+            'ExpressionAttributeValues': {':block': block_value}
+        }
+    else:
+        query_kwargs = {
+            'IndexName': index_name,
+            'KeyConditionExpression': KEY_CONDITION_EXPRESSION,
+            'ExpressionAttributeValues': {':block': block_value, ':max_version': max_version}
+        }
+    
+    if limit == 0 and version_is_string:
+        # Nothing will be displayed, but each version still has to be checked,
+        # so fetch only that attribute and count the items that pass
+        items = []
+        total = sum(1 for item in query_items(
+            table,
+            ProjectionExpression='#v',
+            ExpressionAttributeNames={'#b': 'block', '#v': 'version'},
+            **query_kwargs
+        ) if version_at_most(item, max_version))
+    elif limit == 0:
+        # Nothing will be displayed, so let DynamoDB count the items instead of returning them
+        items = []
+        total = count_items(table, ExpressionAttributeNames={'#b': 'block', '#v': 'version'}, **query_kwargs)
+    else:
+        items = query_items(
+            table,
+            ScanIndexForward=False,  # This gives us descending order by version
+            ProjectionExpression=PROJECTION_EXPRESSION,
+            ExpressionAttributeNames=PROJECTION_NAMES,
+            **query_kwargs
         )
-    except Exception as e:
-        print(f"First attempt failed with error: {e}")
-        # Second attempt with version as string
-        try:
-            response = table.query(
-                IndexName=index_name,
-                KeyConditionExpression=Key('block').eq(block_value) & Key('version').lte(max_version_str),
-                ScanIndexForward=False  # This gives us descending order by version
-            )
-        except Exception as e2:
-            print(f"Second attempt failed with error: {e2}")
-            # Try a simple query without version condition
-            response = table.query(
-                IndexName=index_name,
-                KeyConditionExpression=Key('block').eq(block_value),
-                ScanIndexForward=False  # This gives us descending order by version
-            )
-    
-    # Collect all items
-    all_items = response.get('Items', [])
-    
-    # Handle pagination to get all results
-    while 'LastEvaluatedKey' in response:
-        try:
-            response = table.query(
-                IndexName=index_name,
-                KeyConditionExpression=Key('block').eq(block_value) & Key('version').lte(max_version_num),
-                ScanIndexForward=False,
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-        except Exception:
-            # Try with string version if number fails
-            response = table.query(
-                IndexName=index_name,
-                KeyConditionExpression=Key('block').eq(block_value) & Key('version').lte(max_version_str),
-                ScanIndexForward=False,
-                ExclusiveStartKey=response['LastEvaluatedKey']
-            )
-        
-        all_items.extend(response.get('Items', []))
-    
-    # Filter items where version <= max_version (in case we had to query without version condition)
-    filtered_items = []
-    for item in all_items:
-        item_version = item.get('version')
-        # Try to convert version to int if it's stored as string
-        if isinstance(item_version, str):
-            try:
-                item_version = int(item_version)
-            except ValueError:
-                pass
-        
-        # Compare with max_version (as int)
-        if isinstance(item_version, (int, float)) and item_version <= max_version_num:
-            filtered_items.append(item)
+        if version_is_string:
+            items = (item for item in items if version_at_most(item, max_version))
+        items = list(items)
+        total = len(items)
     
     end_time = time.time()
     duration = end_time - start_time
     
     print(f"Query completed in {duration:.2f} seconds")
-    print(f"Total items found: {len(filtered_items)}")
+    print(f"Total items found: {total}")
     
-    return filtered_items
+    return items
 
 def print_items(items, limit=100):
     """
@@ -133,10 +175,10 @@ def print_items(items, limit=100):
     print(header)
     print("-" * len(header))
     
-    # Print only up to the limit
-    for i, item in enumerate(items[:limit]):
-        row = " | ".join(f"{str(item.get(col, ''))[:15]:<15}" for col in columns)
-        print(row)
+    # Print only up to the limit, building all rows first and writing them in one call
+    rows = "\n".join(" | ".join(f"{str(item.get(col, ''))[:15]:<15}" for col in columns)
+                     for item in items[:limit])
+    sys.stdout.write(rows + "\n")
     
     if len(items) > limit:
         print(f"\n... and {len(items) - limit} more items (showing {limit} of {len(items)} total)")
@@ -149,7 +191,7 @@ def main():
     parser.add_argument('--table', type=str, default='map', help='DynamoDB table name')
     parser.add_argument('--index', type=str, default='block-version-index', help='GSI name')
     parser.add_argument('--region', type=str, default='us-east-1', help='AWS region')
-    parser.add_argument('--limit', type=int, default=100, help='Number of items to display')
+    parser.add_argument('--limit', type=int, default=100, help='Number of items to display (0 only counts them)')
     
     args = parser.parse_args()
     
@@ -163,8 +205,9 @@ def main():
         limit=args.limit
     )
     
-    # Print the results
-    print_items(items, limit=args.limit)
+    # Print the results, unless this was a count-only run
+    if args.limit:
+        print_items(items, limit=args.limit)
 
 if __name__ == "__main__":
     main()
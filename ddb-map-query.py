@@ -1,7 +1,43 @@
 import boto3
-from boto3.dynamodb.conditions import Key
+import functools
+import os
+from boto3.dynamodb.types import TypeDeserializer
 import time
 import argparse
+import sys
+
+# Only the attributes the results are built from
+PROJECTION_EXPRESSION = '#e, #v, #b, #s, #t'
+PROJECTION_NAMES = {'#e': 'ele', '#v': 'version', '#b': 'block', '#s': 'status', '#t': 'timestamp'}
+
+# Block/version key condition on the GSI, written out once for every page
+KEY_CONDITION_EXPRESSION = '#b = :block AND #v <= :max_version'
+
+# Optional DAX cluster endpoint (dax://...); queries go straight to DynamoDB when unset
+DAX_ENDPOINT = os.environ.get('DAX_ENDPOINT')
+
+deserializer = TypeDeserializer()
+
+@functools.lru_cache(maxsize=None)
+def _client(region):
+    """Return a cached low-level client so repeated calls skip client and credential setup"""
+    if DAX_ENDPOINT:
+        # Only needed when querying through DAX: pip install amazon-dax-client
+        from amazondax import AmazonDaxClient
+        return AmazonDaxClient(endpoint_url=DAX_ENDPOINT, region_name=region)
+    return boto3.client('dynamodb', region_name=region)
+
+def query_items(client, **query_kwargs):
+    """
+    Yield the raw (DynamoDB-typed) items of a query page by page, following
+    LastEvaluatedKey so callers can stop early without fetching the remaining pages.
+    """
+    response = client.query(**query_kwargs)
+    yield from response.get('Items', [])
+    
+    while 'LastEvaluatedKey' in response:
+        response = client.query(ExclusiveStartKey=response['LastEvaluatedKey'], **query_kwargs)
+        yield from response.get('Items', [])
 
 def query_max_versions_by_block(block_value, max_version_threshold=20, table_name='map', region='us-east-1'):
     """
@@ -17,9 +53,7 @@ def query_max_versions_by_block(block_value, max_version_threshold=20, table_nam
     Returns:
     - List of items with versions equal to the threshold
     """
-    # Initialize DynamoDB client
-    dynamodb = boto3.resource('dynamodb', region_name=region)
-    table = dynamodb.Table(table_name)
+    client = _client(region)
     
     start_time = time.time()
     print(f"Querying for block='{block_value}' with version <= {max_version_threshold}")
@@ -28,67 +62,38 @@ def query_max_versions_by_block(block_value, max_version_threshold=20, table_nam
     max_version_str = str(max_version_threshold)
     max_version_int = int(max_version_threshold)
     
-    # Track elements we've seen
-    seen_elements = set()
-    result_items = []
+    # Element ID -> first item seen for it
+    result_items = {}
     items_processed = 0
     
     # Query the GSI with block as partition key and version as sort key
     # ScanIndexForward=False sorts by version in descending order
-    response = table.query(
+    # The low-level client returns raw attribute values, so versions are parsed
+    # straight from their strings and only the kept items are deserialized
+    items = query_items(
+        client,
+        TableName=table_name,
         IndexName='block-version-index',
-        KeyConditionExpression=Key('block').eq(block_value) & Key('version').lte(max_version_str),
-        ScanIndexForward=False  # This gives us descending order by version
+        KeyConditionExpression=KEY_CONDITION_EXPRESSION,
+        ExpressionAttributeValues={':block': {'S': block_value}, ':max_version': {'S': max_version_str}},
+        ScanIndexForward=False,  # This gives us descending order by version
+        ProjectionExpression=PROJECTION_EXPRESSION,
+        ExpressionAttributeNames=PROJECTION_NAMES
     )
     
-    # Process initial query results
-    for item in response.get('Items', []):
+    # Process results; breaking out of the loop stops fetching further pages
+    for item in items:
         items_processed += 1
-        ele_id = item['ele']
-        current_version = int(item['version']) if isinstance(item['version'], str) else item['version']
+        version = item['version']
+        current_version = int(version['S'] if 'S' in version else version['N'])
         
         # Stop processing if we encounter a version less than max_version
         if current_version < max_version_int:
             print(f"Early termination: Found version {current_version} < {max_version_int}")
             break
         
-        # If we haven't seen this element before, add it to results
-        if ele_id not in seen_elements:
-            seen_elements.add(ele_id)
-            result_items.append(item)
-    
-    # Handle pagination if needed, with early termination check
-    while 'LastEvaluatedKey' in response and items_processed > 0:
-        response = table.query(
-            IndexName='block-version-index',
-            KeyConditionExpression=Key('block').eq(block_value) & Key('version').lte(max_version_str),
-            ScanIndexForward=False,
-            ExclusiveStartKey=response['LastEvaluatedKey']
-        )
-        
-        # Early termination flag
-        should_break = False
-        
-        # Continue processing items
-        for item in response.get('Items', []):
-            items_processed += 1
-            ele_id = item['ele']
-            current_version = int(item['version']) if isinstance(item['version'], str) else item['version']
-            
-            # Stop processing if we encounter a version less than max_version
-            if current_version < max_version_int:
-                print(f"Early termination: Found version {current_version} < {max_version_int}")
-                should_break = True
-                break
-                
-            # If we haven't seen this element before, add it to results
-            if ele_id not in seen_elements:
-                seen_elements.add(ele_id)
-                result_items.append(item)
-        
-        # If we broke out of the inner loop due to early termination, also break out of the outer loop
-        if should_break:
-            break
+        # Keep only the first item for each element
+        result_items.setdefault(item['ele']['S'], item)
     
     end_time = time.time()
     duration = end_time - start_time
@@ -97,7 +102,8 @@ def query_max_versions_by_block(block_value, max_version_threshold=20, table_nam
     print(f"Processed {items_processed} total items")
     print(f"Found {len(result_items)} unique elements with version {max_version_int}")
     
-    return result_items
+    return [{name: deserializer.deserialize(value) for name, value in item.items()}
+            for item in result_items.values()]
 
 def print_query_results(results, limit=10):
     """
@@ -115,9 +121,9 @@ def print_query_results(results, limit=10):
     print(f"{'Element ID':<20} {'Version':<10} {'Block':<20}")
     print("-" * 60)
     
-    # Print only up to the limit
-    for i, item in enumerate(results[:limit]):
-        print(f"{item['ele']:<20} {item['version']:<10} {item['block']:<20}")
+    # Print only up to the limit, building all rows first and writing them in one call
+    rows = "\n".join(f"{item['ele']:<20} {item['version']:<10} {item['block']:<20}" for item in results[:limit])
+    sys.stdout.write(rows + "\n")
     
     if len(results) > limit:
         print(f"\n... and {len(results) - limit} more results (showing {limit} of {len(results)} total)")
@@ -1,9 +1,44 @@
 import boto3
-from boto3.dynamodb.conditions import Key
+import functools
+import os
 import time
 import argparse
+import sys
 
-def query_max_versions_by_block(block_value, max_version_threshold='20', table_name='map', region='us-east-1'):
+# Only the attributes the results are built from
+PROJECTION_EXPRESSION = '#e, #v, #b, #s, #t'
+PROJECTION_NAMES = {'#e': 'ele', '#v': 'version', '#b': 'block', '#s': 'status', '#t': 'timestamp'}
+
+# Block/version key condition on the GSI, written out once instead of
+# rebuilding and re-serializing Key() conditions for every page
+KEY_CONDITION_EXPRESSION = '#b = :block AND #v <= :max_version'
+
+# Optional DAX cluster endpoint (dax://...); queries go straight to DynamoDB when unset
+DAX_ENDPOINT = os.environ.get('DAX_ENDPOINT')
+
+@functools.lru_cache(maxsize=None)
+def _table(region, table_name):
+    """Return a cached Table resource so repeated calls skip client and credential setup"""
+    if DAX_ENDPOINT:
+        # Only needed when querying through DAX: pip install amazon-dax-client
+        from amazondax import AmazonDaxClient
+        return AmazonDaxClient.resource(endpoint_url=DAX_ENDPOINT, region_name=region).Table(table_name)
+    return boto3.resource('dynamodb', region_name=region).Table(table_name)
+
+def query_items(table, **query_kwargs):
+    """
+    Yield the items of a query page by page, following LastEvaluatedKey
+    so callers can stop early without fetching the remaining pages.
+    """
+    response = table.query(**query_kwargs)
+    yield from response.get('Items', [])
+    
+    while 'LastEvaluatedKey' in response:
+        response = table.query(ExclusiveStartKey=response['LastEvaluatedKey'], **query_kwargs)
+        yield from response.get('Items', [])
+
+def query_max_versions_by_block(block_value, max_version_threshold='20', table_name='map', region='us-east-1',
+                                expected_elements=None):
     """
     Query elements in a specific block with versions <= threshold,
     returning the max version for each element.
@@ -16,57 +51,44 @@ def query_max_versions_by_block(block_value, max_version_threshold='20', table_n
     - max_version_threshold: Maximum version to consider
     - table_name: DynamoDB table name
     - region: AWS region
+    - expected_elements: Number of distinct elements in the block, if known;
+      the query stops as soon as that many have been seen
     
     Returns:
     - List of items with max version for each element
     """
-    # Initialize DynamoDB client
-    dynamodb = boto3.resource('dynamodb', region_name=region)
-    table = dynamodb.Table(table_name)
+    table = _table(region, table_name)
     
     start_time = time.time()
     print(f"Querying for block='{block_value}' with version <= {max_version_threshold}")
     
     # Query the GSI with block as partition key and version as sort key
     # ScanIndexForward=False sorts by version in descending order
-    response = table.query(
-        IndexName='block-version-index',
-        KeyConditionExpression=Key('block').eq(block_value) & Key('version').lte(max_version_threshold),
-        ScanIndexForward=False  # This gives us descending order by version
-    )
-    
-    # Track elements we've seen - the first occurrence will be the max version
-    seen_elements = set()
-    max_version_items = []
+    query_kwargs = {
+        'IndexName': 'block-version-index',
+        'KeyConditionExpression': KEY_CONDITION_EXPRESSION,
+        'ExpressionAttributeValues': {':block': block_value, ':max_version': max_version_threshold},
+        'ScanIndexForward': False,  # This gives us descending order by version
+        'ProjectionExpression': PROJECTION_EXPRESSION,
+        'ExpressionAttributeNames': PROJECTION_NAMES
+    }
+    if expected_elements:
+        # Keep pages small so we don't read far past the last new element
+        query_kwargs['Limit'] = expected_elements * 2
+    items = query_items(table, **query_kwargs)
+    
+    # Element ID -> item; the first occurrence of each element is its max version
+    max_version_items = {}
     items_processed = 0
     
-    # Process initial query results
-    for item in response.get('Items', []):
+    # Process query results across all pages
+    for item in items:
         items_processed += 1
-        ele_id = item['ele']
-        
-        # If we haven't seen this element before, it's the max version
-        if ele_id not in seen_elements:
-            seen_elements.add(ele_id)
-            max_version_items.append(item)
-    
-    # Handle pagination if needed
-    while 'LastEvaluatedKey' in response:
-        response = table.query(
-            IndexName='block-version-index',
-            KeyConditionExpression=Key('block').eq(block_value) & Key('version').lte(max_version_threshold),
-            ScanIndexForward=False,
-            ExclusiveStartKey=response['LastEvaluatedKey']
-        )
+        max_version_items.setdefault(item['ele'], item)
         
-        # Continue processing items
-        for item in response.get('Items', []):
-            items_processed += 1
-            ele_id = item['ele']
-            
-            if ele_id not in seen_elements:
-                seen_elements.add(ele_id)
-                max_version_items.append(item)
+        # Every element has its max version now, the remaining pages can be skipped
+        if expected_elements and len(max_version_items) >= expected_elements:
+            break
     
     end_time = time.time()
     duration = end_time - start_time
@@ -75,7 +97,7 @@ def query_max_versions_by_block(block_value, max_version_threshold='20', table_n
     print(f"Processed {items_processed} total items")
     print(f"Found {len(max_version_items)} unique elements with their max versions")
     
-    return max_version_items
+    return list(max_version_items.values())
 
 def print_query_results(results, limit=10):
     """
@@ -89,9 +111,10 @@ def print_query_results(results, limit=10):
     print(f"{'Element ID':<20} {'Version':<10} {'Block':<20}")
     print("-" * 60)
     
-    # Print only up to the limit
-    for i, item in enumerate(results[:limit]):
-        print(f"{item['ele']:<20} {item['version']:<10} {item['block']:<20}")
+    # Print only up to the limit, building all rows first and writing them in one call
+    rows = "\n".join(f"{item['ele']:<20} {item['version']:<10} {item['block']:<20}" for item in results[:limit])
+    if rows:
+        sys.stdout.write(rows + "\n")
     
     if len(results) > limit:
         print(f"\n... and {len(results) - limit} more results (showing {limit} of {len(results)} total)")
@@ -104,6 +127,7 @@ def main():
     parser.add_argument('--table', type=str, default='map', help='DynamoDB table name')
     parser.add_argument('--region', type=str, default='us-east-1', help='AWS region')
     parser.add_argument('--limit', type=int, default=10, help='Number of results to display')
+    parser.add_argument('--expected-elements', type=int, help='Number of distinct elements in the block, enables early stop')
     
     args = parser.parse_args()
     
@@ -112,7 +136,8 @@ def main():
         block_value=args.block,
         max_version_threshold=args.max_version,
         table_name=args.table,
-        region=args.region
+        region=args.region,
+        expected_elements=args.expected_elements
     )
     
     # Print the results
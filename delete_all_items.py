@@ -1,66 +1,94 @@
 import boto3
+import functools
 import time
 import argparse
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 
-def delete_all_items(table_name, region='us-east-1'):
-    """Delete all items from a DynamoDB table"""
+@functools.lru_cache(maxsize=None)
+def _table(region, table_name):
+    """Return a cached Table resource so repeated calls skip client and credential setup"""
+    return boto3.resource('dynamodb', region_name=region).Table(table_name)
+
+def scan_keys(table, key_attributes, segment=0, total_segments=1):
+    """Yield the key attributes of every item in one scan segment, one page at a time"""
+    scan_kwargs = {
+        'ProjectionExpression': ', '.join(f"#k{i}" for i in range(len(key_attributes))),
+        'ExpressionAttributeNames': {f"#k{i}": attr for i, attr in enumerate(key_attributes)},
+        'Segment': segment,
+        'TotalSegments': total_segments
+    }
+    response = table.scan(**scan_kwargs)
+    yield from response.get('Items', [])
+    
+    while 'LastEvaluatedKey' in response:
+        response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'], **scan_kwargs)
+        yield from response.get('Items', [])
+
+def delete_segment(table_name, region, key_attributes, segment, total_segments):
+    """
+    Delete the items of one scan segment and return (deleted_count, completed).
+    completed is False when an error stopped the segment; deleted_count then
+    also includes deletes that were queued but never sent.
+    """
+    # boto3 resources aren't thread-safe, so each segment gets its own session
+    table = boto3.session.Session().resource('dynamodb', region_name=region).Table(table_name)
+    
+    # Stream the scanned keys straight into batched deletes (25 per BatchWriteItem request)
+    deleted_count = 0
+    try:
+        with table.batch_writer() as batch:
+            for item in scan_keys(table, key_attributes, segment, total_segments):
+                # Extract only the key attributes
+                key = {attr: item[attr] for attr in key_attributes if attr in item}
+                
+                # Queue the delete; batch_writer flushes every 25 items
+                batch.delete_item(Key=key)
+                deleted_count += 1
+                
+                # Print progress every 1000 items
+                if deleted_count % 1000 == 0:
+                    print(f"Segment {segment}: deleted {deleted_count} items...")
+                    
+    except ClientError as e:
+        print(f"Error deleting items in segment {segment}: {e}")
+        return deleted_count, False
+    
+    return deleted_count, True
+
+def delete_all_items(table_name, region='us-east-1', total_segments=8):
+    """Delete all items from a DynamoDB table, scanning segments in parallel"""
     print(f"Starting deletion of all items from table '{table_name}'...")
     start_time = time.time()
     
-    # Initialize DynamoDB resources
-    dynamodb = boto3.resource('dynamodb', region_name=region)
-    table = dynamodb.Table(table_name)
+    table = _table(region, table_name)
     
     # Get the key schema to identify primary key attributes
     try:
-        response = boto3.client('dynamodb', region_name=region).describe_table(TableName=table_name)
-        key_schema = response['Table']['KeySchema']
-        key_attributes = [key['AttributeName'] for key in key_schema]
+        key_attributes = [key['AttributeName'] for key in table.key_schema]
         print(f"Table primary key attributes: {key_attributes}")
     except ClientError as e:
         print(f"Error getting table schema: {e}")
         return
     
-    # Scan the table to get all items
-    items = []
-    try:
-        response = table.scan()
-        items.extend(response.get('Items', []))
-        
-        while 'LastEvaluatedKey' in response:
-            response = table.scan(ExclusiveStartKey=response['LastEvaluatedKey'])
-            items.extend(response.get('Items', []))
-            
-        total_items = len(items)
-        print(f"Found {total_items} items to delete")
-    except ClientError as e:
-        print(f"Error scanning table: {e}")
-        return
+    # Each worker scans and deletes its own segment of the keyspace
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        futures = [executor.submit(delete_segment, table_name, region, key_attributes, segment, total_segments)
+                   for segment in range(total_segments)]
+        results = [future.result() for future in futures]
     
-    # Delete each item
-    deleted_count = 0
-    for item in items:
-        try:
-            # Extract only the key attributes
-            key = {attr: item[attr] for attr in key_attributes if attr in item}
-            
-            # Delete the item
-            table.delete_item(Key=key)
-            deleted_count += 1
-            
-            # Print progress every 100 items
-            if deleted_count % 100 == 0:
-                print(f"Deleted {deleted_count}/{total_items} items...")
-                
-        except ClientError as e:
-            print(f"Error deleting item: {e}")
+    deleted_count = sum(count for count, _ in results)
+    failed_segments = [segment for segment, (_, completed) in enumerate(results) if not completed]
     
     end_time = time.time()
     duration = end_time - start_time
     
-    print(f"Deletion completed in {duration:.2f} seconds")
-    print(f"Successfully deleted {deleted_count} of {total_items} items")
+    if failed_segments:
+        print(f"Deletion stopped early after {duration:.2f} seconds; segments {failed_segments} failed")
+        print(f"The table was only partly cleared: at most {deleted_count} items deleted")
+    else:
+        print(f"Deletion completed in {duration:.2f} seconds")
+        print(f"Successfully deleted {deleted_count} items")
     
     return deleted_count
 
@@ -69,6 +97,7 @@ def main():
     parser = argparse.ArgumentParser(description='Delete all items from a DynamoDB table')
     parser.add_argument('table_name', help='Name of the DynamoDB table to clean')
     parser.add_argument('--region', default='us-east-1', help='AWS region (default: us-east-1)')
+    parser.add_argument('--segments', type=int, default=8, help='Number of parallel scan segments (default: 8)')
     
     args = parser.parse_args()
     
@@ -79,7 +108,7 @@ def main():
         return
         
     # Delete all items
-    delete_all_items(args.table_name, args.region)
+    delete_all_items(args.table_name, args.region, args.segments)
 
 if __name__ == '__main__':
     main()
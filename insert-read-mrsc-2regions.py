@@ -2,16 +2,34 @@ import boto3
 import time
 import uuid
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 from faker import Faker
 
 # Initialize Faker for generating realistic dummy data
 fake = Faker()
 
-# Initialize DynamoDB clients for both regions
-dynamodb_east = boto3.resource('dynamodb', region_name='us-east-1')
-dynamodb_west = boto3.resource('dynamodb', region_name='us-west-2')
-table_east = dynamodb_east.Table('mrsc')
-table_west = dynamodb_west.Table('mrsc')
+# Keep connections alive between requests and back off adaptively when throttled;
+# each thread issues one request at a time, so the default pool size is plenty
+config = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+TABLE_NAME = 'mrsc'
+
+# Thread-local storage for per-thread DynamoDB resources
+thread_local = threading.local()
+
+# Function to get this thread's resources in both regions; boto3 resources aren't thread-safe
+def get_resources():
+    if not hasattr(thread_local, 'resources'):
+        session = boto3.session.Session()
+        dynamodb_east = session.resource('dynamodb', region_name='us-east-1', config=config)
+        dynamodb_west = session.resource('dynamodb', region_name='us-west-2', config=config)
+        thread_local.resources = (dynamodb_east, dynamodb_west)
+    return thread_local.resources
 
 # Function to generate a dummy item
 def generate_item():
@@ -28,25 +46,42 @@ def generate_item():
         'is_active': random.choice([True, False])
     }
 
-# Function to write and read in us-east-1, then read in us-west-2
-def write_and_read_multi_region():
-    item = generate_item()
+# Function to read a list of keys with BatchGetItem (up to 100 keys), retrying unprocessed keys with backoff
+def batch_get(dynamodb, keys, consistent_read=False, max_retries=5):
+    items = []
+    request_items = {TABLE_NAME: {'Keys': keys, 'ConsistentRead': consistent_read}}
+    for retry_count in range(max_retries):
+        response = dynamodb.batch_get_item(RequestItems=request_items)
+        items.extend(response['Responses'].get(TABLE_NAME, []))
+        request_items = response.get('UnprocessedKeys')
+        if not request_items:
+            return items
+        time.sleep((2 ** retry_count) * 0.1)
+    print(f"Failed to read {len(request_items[TABLE_NAME]['Keys'])} items after {max_retries} retries")
+    return items
+
+# Function to write a chunk of items in us-east-1 and read them back there, then read them in us-west-2
+def write_and_read_multi_region(items):
+    dynamodb_east, dynamodb_west = get_resources()
+    keys = [{'id': item['id']} for item in items]
     
-    # Write the item in us-east-1
+    # Write the items in us-east-1; batch_writer sends 25 items per request
     write_start = time.time()
-    table_east.put_item(Item=item)
+    with dynamodb_east.Table(TABLE_NAME).batch_writer() as batch:
+        for item in items:
+            batch.put_item(Item=item)
     write_end = time.time()
     write_time_east = write_end - write_start
     
-    # Read the item in us-east-1
+    # Read the items in us-east-1; strongly consistent so freshly written items are always found
     read_start_east = time.time()
-    response_east = table_east.get_item(Key={'id': item['id']})
+    items_east = batch_get(dynamodb_east, keys, consistent_read=True)
     read_end_east = time.time()
     read_time_east = read_end_east - read_start_east
     
-    # Read the item in us-west-2
+    # Read the items in us-west-2; left eventually consistent to observe replication
     read_start_west = time.time()
-    response_west = table_west.get_item(Key={'id': item['id']})
+    items_west = batch_get(dynamodb_west, keys)
     read_end_west = time.time()
     read_time_west = read_end_west - read_start_west
     
@@ -54,19 +89,25 @@ def write_and_read_multi_region():
 
 # Main function
 def main():
-    start_time = time.time()
-
     total_items = 1000
+    chunk_size = 100  # BatchGetItem reads at most 100 keys per request
+    num_threads = 32
+
+    # Generate all items up front so Faker's CPU time stays out of the measurements
+    items = [generate_item() for _ in range(total_items)]
+
+    start_time = time.time()
     total_write_time_east = 0
     total_read_time_east = 0
     total_read_time_west = 0
 
-    # Process items sequentially
-    for _ in range(total_items):
-        write_time_east, read_time_east, read_time_west = write_and_read_multi_region()
-        total_write_time_east += write_time_east
-        total_read_time_east += read_time_east
-        total_read_time_west += read_time_west
+    # Process chunks of items in parallel so the cross-region round-trips overlap
+    chunks = [items[i:i + chunk_size] for i in range(0, total_items, chunk_size)]
+    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+        for write_time_east, read_time_east, read_time_west in executor.map(write_and_read_multi_region, chunks):
+            total_write_time_east += write_time_east
+            total_read_time_east += read_time_east
+            total_read_time_west += read_time_west
 
     end_time = time.time()
     total_execution_time = end_time - start_time
@@ -1,9 +1,12 @@
 import boto3
 import time
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from decimal import Decimal
 from boto3.dynamodb.conditions import Key, Attr
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 # Constants
@@ -14,6 +17,24 @@ NUM_BLOCKS = 50
 STATUS_VALUES = ['ACTIVE', 'INACTIVE', 'MAINTENANCE', 'PENDING']
 COLUMNS_PER_ELEMENT = 5  # Each element has exactly 5 columns
 VERSIONS_PER_ELEMENT_COLUMN = 200  # ~200 versions per element-column to reach 100,000 items
+NUM_WORKERS = 32  # Element-columns written in parallel
+
+# Reuse keep-alive connections and back off adaptively when throttled
+BOTO_CONFIG = Config(
+    max_pool_connections=128,
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+# Thread-local storage for per-thread DynamoDB tables
+thread_local = threading.local()
+
+def get_table():
+    """Get this thread's table; boto3 resources aren't thread-safe"""
+    if not hasattr(thread_local, 'table'):
+        dynamodb = boto3.session.Session().resource('dynamodb', region_name='us-east-1', config=BOTO_CONFIG)
+        thread_local.table = dynamodb.Table(TABLE_NAME)
+    return thread_local.table
 
 def create_table(dynamodb_client):
     """Create the DynamoDB table with the specified schema using on-demand capacity"""
@@ -84,7 +105,7 @@ def create_table(dynamodb_client):
         print(f"Error creating table: {e}")
         raise e
 
-def generate_random_item(element_id, column_id, version, base_timestamp_ms):
+def generate_random_item(element_id, column_id, version, base_timestamp_ms, now_iso):
     """Generate a random item for the DynamoDB table"""
     element_col_id = f"ele{element_id}#col{column_id}"
     
@@ -95,9 +116,10 @@ def generate_random_item(element_id, column_id, version, base_timestamp_ms):
     # to ensure unique timestamps for the same element_col_id
     timestamp_ms = base_timestamp_ms + version
     
-    # Generate random geo location
-    latitude = Decimal(str(random.uniform(24.0, 49.0)))  # US latitude range
-    longitude = Decimal(str(random.uniform(-125.0, -66.0)))  # US longitude range
+    # Generate random geo location as integer microdegrees (degrees * 1,000,000, ~0.11m);
+    # integers serialize more cheaply and store smaller than 6-decimal Decimals
+    latitude = int(random.uniform(24.0, 49.0) * 1_000_000)  # US latitude range
+    longitude = int(random.uniform(-125.0, -66.0) * 1_000_000)  # US longitude range
     
     # Create the item
     item = {
@@ -108,34 +130,43 @@ def generate_random_item(element_id, column_id, version, base_timestamp_ms):
         'geo_location': {
             'latitude': latitude,
             'longitude': longitude,
-            'accuracy': Decimal(str(random.uniform(1.0, 10.0)))
+            'accuracy': Decimal(f"{random.uniform(1.0, 10.0):.6f}")
         },
         'metadata': {
-            'reading': Decimal(str(random.uniform(0, 100))),
+            'reading': Decimal(f"{random.uniform(0, 100):.6f}"),
             'unit': 'meters',
-            'quality': Decimal(str(random.uniform(0, 1))),
+            'quality': Decimal(f"{random.uniform(0, 1):.6f}"),
             'version': version
         },
         'element_id': f"ele{element_id}",
         'column_id': column_id,
         'source': f"sensor{random.randint(1, 100)}",
         'is_valid': random.choice([True, False]),
-        'last_updated': datetime.now().isoformat()
+        'last_updated': now_iso
     }
     
     return item
 
-def insert_items(dynamodb_resource):
+def insert_element_column(element_id, column_id, num_versions, base_timestamp_ms):
+    """Write every version of one element-column and return how many items were written"""
+    # batch_writer flushes every 25 items (the DynamoDB batch write limit)
+    # and resends unprocessed items on its own
+    # All versions are generated within moments of each other, so they share one last_updated
+    now_iso = datetime.now().isoformat()
+    with get_table().batch_writer(overwrite_by_pkeys=['element_col_id', 'timestamp']) as batch:
+        for version in range(num_versions):
+            batch.put_item(Item=generate_random_item(element_id, column_id, version, base_timestamp_ms, now_iso))
+    return num_versions
+
+def insert_items():
     """Insert items into the DynamoDB table"""
     try:
-        table = dynamodb_resource.Table(TABLE_NAME)
         print(f"Inserting approximately {TOTAL_ITEMS} items into the table...")
         
         # For 100 elements with 5 columns each, we need ~200 versions per element-column
         # to reach 100,000 items: 100 * 5 * 200 = 100,000
         
         items_inserted = 0
-        batch_size = 25  # DynamoDB batch write limit
         start_time = time.time()
         last_progress_time = start_time
         
@@ -147,58 +178,39 @@ def insert_items(dynamodb_resource):
         print(f"Creating {NUM_ELEMENTS} elements, each with {COLUMNS_PER_ELEMENT} columns")
         print(f"Each element-column will have approximately {versions_per_combo} versions")
         
-        # Create items for each element
-        for element_id in range(1, NUM_ELEMENTS + 1):
-            # Each element has exactly 5 columns
-            for column_id in range(1, COLUMNS_PER_ELEMENT + 1):
-                # Generate a base timestamp for this element-column combination
-                # Base timestamp is between 1-365 days ago to spread data over a year
-                base_days_ago = random.randint(1, 365)
-                base_timestamp_ms = int((datetime.now() - timedelta(days=base_days_ago)).timestamp() * 1000)
-                
-                # Determine versions for this element-column
-                current_versions = versions_per_combo
-                if remaining_items > 0:
-                    current_versions += 1
-                    remaining_items -= 1
-                
-                # Process versions in smaller chunks to avoid memory issues
-                batch_items = []
-                
-                for version in range(current_versions):
-                    item = generate_random_item(element_id, column_id, version, base_timestamp_ms)
-                    batch_items.append(item)
-                    items_inserted += 1
+        # Each element-column is written by one worker, so writes overlap across element-columns
+        with ThreadPoolExecutor(max_workers=NUM_WORKERS) as executor:
+            futures = []
+            
+            # Create items for each element
+            for element_id in range(1, NUM_ELEMENTS + 1):
+                # Each element has exactly 5 columns
+                for column_id in range(1, COLUMNS_PER_ELEMENT + 1):
+                    # Generate a base timestamp for this element-column combination
+                    # Base timestamp is between 1-365 days ago to spread data over a year
+                    base_days_ago = random.randint(1, 365)
+                    base_timestamp_ms = int((datetime.now() - timedelta(days=base_days_ago)).timestamp() * 1000)
                     
-                    # If we've reached the batch size, write the batch
-                    if len(batch_items) >= batch_size:
-                        with table.batch_writer() as batch:
-                            for batch_item in batch_items:
-                                batch.put_item(Item=batch_item)
-                        
-                        batch_items = []
-                        
-                        # Print progress every 5 seconds or every 5000 items
-                        current_time = time.time()
-                        if items_inserted % 5000 == 0 or (current_time - last_progress_time) >= 5:
-                            elapsed = current_time - start_time
-                            items_per_second = items_inserted / elapsed if elapsed > 0 else 0
-                            print(f"Inserted {items_inserted} items... ({items_per_second:.2f} items/sec, {items_inserted/TOTAL_ITEMS*100:.1f}%)")
-                            last_progress_time = current_time
-                
-                # Write any remaining items for this element-column
-                if batch_items:
-                    with table.batch_writer() as batch:
-                        for batch_item in batch_items:
-                            batch.put_item(Item=batch_item)
+                    # Determine versions for this element-column
+                    current_versions = versions_per_combo
+                    if remaining_items > 0:
+                        current_versions += 1
+                        remaining_items -= 1
                     
-                    # Print progress
-                    current_time = time.time()
-                    if (current_time - last_progress_time) >= 5:
-                        elapsed = current_time - start_time
-                        items_per_second = items_inserted / elapsed if elapsed > 0 else 0
-                        print(f"Inserted {items_inserted} items... ({items_per_second:.2f} items/sec, {items_inserted/TOTAL_ITEMS*100:.1f}%)")
-                        last_progress_time = current_time
+                    futures.append(executor.submit(
+                        insert_element_column, element_id, column_id, current_versions, base_timestamp_ms
+                    ))
+            
+            for future in as_completed(futures):
+                items_inserted += future.result()
+                
+                # Print progress every 5 seconds or every 5000 items
+                current_time = time.time()
+                if items_inserted % 5000 == 0 or (current_time - last_progress_time) >= 5:
+                    elapsed = current_time - start_time
+                    items_per_second = items_inserted / elapsed if elapsed > 0 else 0
+                    print(f"Inserted {items_inserted} items... ({items_per_second:.2f} items/sec, {items_inserted/TOTAL_ITEMS*100:.1f}%)")
+                    last_progress_time = current_time
         
         total_time = time.time() - start_time
         print(f"Successfully inserted {items_inserted} items in {total_time:.2f} seconds.")
@@ -213,15 +225,14 @@ def main():
     """Main function to create table and insert items"""
     start_time = time.time()
     
-    # Initialize DynamoDB client and resource
-    dynamodb_client = boto3.client('dynamodb', region_name='us-east-1')
-    dynamodb_resource = boto3.resource('dynamodb', region_name='us-east-1')
+    # Initialize DynamoDB client; the insert workers create their own resources
+    dynamodb_client = boto3.client('dynamodb', region_name='us-east-1', config=BOTO_CONFIG)
     
     # Create table
     create_table(dynamodb_client)
     
     # Insert items
-    insert_items(dynamodb_resource)
+    insert_items()
     
     total_time = time.time() - start_time
     print(f"Table creation and data insertion completed in {total_time:.2f} seconds.")
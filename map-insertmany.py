@@ -14,6 +14,7 @@ from botocore.config import Config
 import threading
 import queue
 import sys
+import tempfile
 
 # Configure logging
 logging.basicConfig(
@@ -24,53 +25,36 @@ logger = logging.getLogger(__name__)
 
 # Configure boto3 connection pooling
 boto_config = Config(
-    max_pool_connections=100,  # Significantly increased pool size
+    max_pool_connections=100,  # Shared by all workers; twice the default 50 workers
     retries={'max_attempts': 5, 'mode': 'adaptive'},
     connect_timeout=5,
-    read_timeout=30
+    read_timeout=30,
+    tcp_keepalive=True
 )
 
+def save_progress(progress_file, last_index):
+    """Write the checkpoint to a temp file and swap it in, so a crash never leaves a torn file"""
+    directory = os.path.dirname(os.path.abspath(progress_file))
+    with tempfile.NamedTemporaryFile('w', dir=directory, delete=False) as f:
+        json.dump({'last_index': last_index}, f)
+    os.replace(f.name, progress_file)
+
 class MapDynamoDBManager:
-    def __init__(self, table_name='mapdemo', region='us-east-1', endpoint_url=None):
+    def __init__(self, table_name='mapdemo', region='us-east-1', endpoint_url=None, use_transactions=False):
         """Initialize the DynamoDB manager"""
         self.table_name = table_name
         self.region = region
         self.endpoint_url = endpoint_url
-        self.client_pool = queue.Queue()
-        self.client_pool_size = 50  # Number of clients to pre-create
-        self._initialize_client_pool()
-
-    def _initialize_client_pool(self):
-        """Initialize a pool of DynamoDB clients"""
-        for _ in range(self.client_pool_size):
-            client = boto3.client(
-                'dynamodb',
-                region_name=self.region,
-                config=boto_config,
-                endpoint_url=self.endpoint_url
-            )
-            self.client_pool.put(client)
-
-    def _get_client(self):
-        """Get a client from the pool"""
-        try:
-            return self.client_pool.get(block=False)
-        except queue.Empty:
-            # Create a new client if pool is empty
-            return boto3.client(
-                'dynamodb',
-                region_name=self.region,
-                config=boto_config,
-                endpoint_url=self.endpoint_url
-            )
-
-    def _return_client(self, client):
-        """Return a client to the pool"""
-        try:
-            self.client_pool.put(client, block=False)
-        except queue.Full:
-            # Just discard if pool is full
-            pass
+        # Write batches with TransactWriteItems (up to 100 items, all-or-nothing, 2x WCU)
+        # instead of BatchWriteItem (up to 25 items)
+        self.use_transactions = use_transactions
+        # Clients are thread-safe, so every worker shares this one client and its connection pool
+        self.client = boto3.client(
+            'dynamodb',
+            region_name=self.region,
+            config=boto_config,
+            endpoint_url=self.endpoint_url
+        )
 
     def generate_batch_data(self, start_idx, batch_size, branches, tiles, element_types):
         """Generate a batch of data items - optimized for speed"""
@@ -118,49 +102,73 @@ class MapDynamoDBManager:
         """Write items in batches with retry logic"""
         request_items = {self.table_name: items}
 
-        # Get client from pool
-        client = self._get_client()
+        retries = 0
+        backoff_time = 50  # Start with 50ms
 
-        try:
-            retries = 0
-            backoff_time = 50  # Start with 50ms
+        while retries < max_retries:
+            try:
+                response = self.client.batch_write_item(RequestItems=request_items)
+                unprocessed = response.get('UnprocessedItems', {})
 
-            while retries < max_retries:
-                try:
-                    response = client.batch_write_item(RequestItems=request_items)
-                    unprocessed = response.get('UnprocessedItems', {})
+                if not unprocessed or not unprocessed.get(self.table_name):
+                    return True
 
-                    if not unprocessed or not unprocessed.get(self.table_name):
-                        return True
+                # If there are unprocessed items, retry with backoff
+                request_items = unprocessed
+                retries += 1
 
-                    # If there are unprocessed items, retry with backoff
-                    request_items = unprocessed
-                    retries += 1
+                if retries < max_retries:
+                    time.sleep(backoff_time / 1000.0)  # Convert ms to seconds
+                    backoff_time = min(backoff_time * 2, 1000)  # Exponential backoff capped at 1 second
 
+            except ClientError as e:
+                error_code = e.response['Error']['Code']
+
+                # Handle provisioned throughput exceeded with backoff
+                if error_code == 'ProvisionedThroughputExceededException':
+                    retries += 1
                     if retries < max_retries:
-                        time.sleep(backoff_time / 1000.0)  # Convert ms to seconds
-                        backoff_time = min(backoff_time * 2, 1000)  # Exponential backoff capped at 1 second
-
-                except ClientError as e:
-                    error_code = e.response['Error']['Code']
-
-                    # Handle provisioned throughput exceeded with backoff
-                    if error_code == 'ProvisionedThroughputExceededException':
-                        retries += 1
-                        if retries < max_retries:
-                            time.sleep(backoff_time / 1000.0)
-                            backoff_time = min(backoff_time * 2, 2000)
-                    else:
-                        logger.error(f"Batch write error: {e}")
-                        retries += 1
-                        if retries >= max_retries:
-                            return False
                         time.sleep(backoff_time / 1000.0)
+                        backoff_time = min(backoff_time * 2, 2000)
+                else:
+                    logger.error(f"Batch write error: {e}")
+                    retries += 1
+                    if retries >= max_retries:
+                        return False
+                    time.sleep(backoff_time / 1000.0)
 
-            return False
-        finally:
-            # Return client to pool
-            self._return_client(client)
+        return False
+
+    def transact_write_with_retry(self, items, max_retries=5):
+        """Write up to 100 items atomically with TransactWriteItems, retrying throttled or cancelled calls"""
+        transact_items = [{'Put': {'TableName': self.table_name, 'Item': request['PutRequest']['Item']}}
+                          for request in items]
+
+        backoff_time = 50  # Start with 50ms
+
+        for retries in range(1, max_retries + 1):
+            try:
+                self.client.transact_write_items(TransactItems=transact_items)
+                return True
+            except ClientError as e:
+                error_code = e.response['Error']['Code']
+                if error_code == 'TransactionCanceledException':
+                    # Only conflicts and throttling can succeed on a resend; items that
+                    # fail validation or a condition check fail the same way every time
+                    reasons = {reason.get('Code') for reason in e.response.get('CancellationReasons', [])}
+                    reasons.discard('None')
+                    retryable = reasons <= {'TransactionConflict', 'ThrottlingError'}
+                else:
+                    retryable = error_code in ('ProvisionedThroughputExceededException', 'ThrottlingException')
+                if not retryable:
+                    logger.error(f"Transact write error: {e}")
+                    return False
+                # The whole transaction was rejected, so resend all of it
+                if retries < max_retries:
+                    time.sleep(backoff_time / 1000.0)
+                    backoff_time = min(backoff_time * 2, 2000)
+
+        return False
 
     def parallel_insert_large_dataset(self, total_items, batch_size=25, max_workers=50):
         """Insert a large dataset in parallel with optimized throughput"""
@@ -181,12 +189,14 @@ class MapDynamoDBManager:
         else:
             start_idx = 0
 
-        # Stats tracking
+        # Stats tracking; each consumer only bumps its own slot, so no lock is needed
         start_time = time.time()
         last_log_time = start_time
+        last_checkpoint_time = start_time
+        checkpoint_interval = 30  # seconds between progress file writes
+        worker_counts = [0] * max_workers
         items_inserted = 0
         last_items_inserted = 0
-        stats_lock = threading.Lock()
 
         # Batch queue for better control
         batch_queue = queue.Queue(maxsize=max_workers * 2)
@@ -210,9 +220,7 @@ class MapDynamoDBManager:
         producer_thread.start()
 
         # Consumer function for worker threads
-        def batch_consumer():
-            nonlocal items_inserted
-
+        def batch_consumer(worker_idx):
             while not done_event.is_set():
                 try:
                     item = batch_queue.get(timeout=1)
@@ -221,13 +229,15 @@ class MapDynamoDBManager:
                         break
 
                     batch, idx, size = item
-                    success = self.batch_write_with_retry(batch)
+                    if self.use_transactions:
+                        success = self.transact_write_with_retry(batch)
+                    else:
+                        success = self.batch_write_with_retry(batch)
 
-                    with stats_lock:
-                        if success:
-                            items_inserted += size
-                        else:
-                            logger.warning(f"Failed to insert batch at index {idx}")
+                    if success:
+                        worker_counts[worker_idx] += size
+                    else:
+                        logger.warning(f"Failed to insert batch at index {idx}")
 
                     batch_queue.task_done()
                 except queue.Empty:
@@ -237,7 +247,7 @@ class MapDynamoDBManager:
 
         # Start consumer threads
         with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            consumers = [executor.submit(batch_consumer) for _ in range(max_workers)]
+            consumers = [executor.submit(batch_consumer, worker_idx) for worker_idx in range(max_workers)]
 
             try:
                 # Monitor progress and throughput
@@ -246,8 +256,8 @@ class MapDynamoDBManager:
                     current_time = time.time()
                     elapsed = current_time - last_log_time
 
-                    with stats_lock:
-                        items_since_last = items_inserted - last_items_inserted
+                    items_inserted = sum(worker_counts)
+                    items_since_last = items_inserted - last_items_inserted
 
                     if elapsed > 0:
                         rate = items_since_last / elapsed
@@ -263,17 +273,17 @@ class MapDynamoDBManager:
                         last_log_time = current_time
                         last_items_inserted = items_inserted
 
-                        # Save progress
-                        with open(progress_file, 'w') as f:
-                            json.dump({'last_index': start_idx + items_inserted}, f)
+                    # Save progress less often than we log it
+                    if current_time - last_checkpoint_time >= checkpoint_interval:
+                        save_progress(progress_file, start_idx + items_inserted)
+                        last_checkpoint_time = current_time
 
             except KeyboardInterrupt:
                 logger.info("Interrupted. Shutting down gracefully...")
                 done_event.set()
 
                 # Save progress before exiting
-                with open(progress_file, 'w') as f:
-                    json.dump({'last_index': start_idx + items_inserted}, f)
+                save_progress(progress_file, start_idx + sum(worker_counts))
 
             # Wait for all consumers to finish
             for future in consumers:
@@ -282,7 +292,9 @@ class MapDynamoDBManager:
                 except concurrent.futures.TimeoutError:
                     logger.warning("Timeout waiting for worker to complete")
 
-        # Final stats
+        # Final stats and checkpoint
+        items_inserted = sum(worker_counts)
+        save_progress(progress_file, start_idx + items_inserted)
         total_time = time.time() - start_time
         final_rate = items_inserted / total_time if total_time > 0 else 0
 
@@ -292,12 +304,16 @@ class MapDynamoDBManager:
         return items_inserted
 
 def main():
+    # Set to True to compare TransactWriteItems (fewer round-trips, 2x WCU) against BatchWriteItem
+    use_transactions = False
+
     # Create manager for existing table in us-east-1
-    manager = MapDynamoDBManager(table_name='mapdemo', region='us-east-1')
+    manager = MapDynamoDBManager(table_name='mapdemo', region='us-east-1', use_transactions=use_transactions)
 
     # Insert 100 million items with aggressive parallelism
     total_items = 100000000
-    batch_size = 25  # DynamoDB batch_write_item limit is 25 items
+    # DynamoDB limits: batch_write_item takes 25 items, transact_write_items takes 100
+    batch_size = 100 if use_transactions else 25
     max_workers = 50  # Increased for maximum throughput
 
     logger.info(f"Starting data insertion of {total_items:,} items")
@@ -1,5 +1,8 @@
 import boto3
+import functools
+import os
 from boto3.dynamodb.conditions import Key
+from botocore.config import Config
 import json
 from decimal import Decimal
 from datetime import datetime
@@ -11,17 +14,34 @@ class DecimalEncoder(json.JSONEncoder):
             return float(obj)
         return super(DecimalEncoder, self).default(obj)
 
+# Optional DAX cluster endpoint (dax://...); queries go straight to DynamoDB when unset
+DAX_ENDPOINT = os.environ.get('DAX_ENDPOINT')
+
+@functools.lru_cache(maxsize=None)
+def _table(region, table_name):
+    """Return a cached Table resource so repeated calls skip client and credential setup"""
+    if DAX_ENDPOINT:
+        # Only needed when querying through DAX: pip install amazon-dax-client
+        from amazondax import AmazonDaxClient
+        return AmazonDaxClient.resource(endpoint_url=DAX_ENDPOINT, region_name=region).Table(table_name)
+    config = Config(retries={'max_attempts': 10, 'mode': 'adaptive'}, tcp_keepalive=True)
+    return boto3.resource('dynamodb', region_name=region, config=config).Table(table_name)
+
+# Attributes returned by the queries; placeholders because 'timestamp' and 'status' are
+# reserved words
+PROJECTION_EXPRESSION = 'element_col_id, #ts, #st'
+PROJECTION_NAMES = {'#ts': 'timestamp', '#st': 'status'}
+
 def query_latest_item():
     """
-    Query the DynamoDB table for the latest item matching the criteria:
+    Query the DynamoDB table for the latest item matching the criteria, returning
+    only element_col_id, timestamp and status:
     - element_col_id = 'ele636#col2'
     - timestamp <= 1725458208650
     - ordered by timestamp descending
     - limit 1 (get only the most recent item)
     """
-    # Initialize DynamoDB resource
-    dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-    table = dynamodb.Table('ElementGeoLocationData')
+    table = _table('us-east-1', 'ElementGeoLocationData')
     
     # Define the query parameters
     element_col_id = 'ele636#col2'
@@ -33,7 +53,9 @@ def query_latest_item():
             KeyConditionExpression=Key('element_col_id').eq(element_col_id) & 
                                   Key('timestamp').lte(max_timestamp),
             ScanIndexForward=False,  # Sort in descending order (newest first)
-            Limit=1  # Get only the first (most recent) item
+            Limit=1,  # Get only the first (most recent) item
+            ProjectionExpression=PROJECTION_EXPRESSION,
+            ExpressionAttributeNames=PROJECTION_NAMES
         )
         
         # Check if any items were returned
@@ -57,6 +79,24 @@ def query_latest_item():
         print(f"Error querying DynamoDB: {e}")
         return None
 
+def query_by_block(block_id, max_timestamp):
+    """
+    Query the BlockIndex GSI for the latest item in a block with
+    timestamp <= max_timestamp, instead of scanning the base table
+    """
+    table = _table('us-east-1', 'ElementGeoLocationData')
+    
+    response = table.query(
+        IndexName='BlockIndex',
+        KeyConditionExpression=Key('block_id').eq(block_id) & Key('timestamp').lte(max_timestamp),
+        ScanIndexForward=False,  # Sort in descending order (newest first)
+        Limit=1,  # Get only the first (most recent) item
+        ProjectionExpression=PROJECTION_EXPRESSION,
+        ExpressionAttributeNames=PROJECTION_NAMES
+    )
+    items = response.get('Items', [])
+    return items[0] if items else None
+
 if __name__ == '__main__':
-    print("Querying: SELECT * FROM ElementGeoLocationData WHERE element_col_id='ele636#col2' AND timestamp <= 1725458208650 ORDER BY timestamp DESC LIMIT 1")
+    print("Querying: SELECT element_col_id, timestamp, status FROM ElementGeoLocationData WHERE element_col_id='ele636#col2' AND timestamp <= 1725458208650 ORDER BY timestamp DESC LIMIT 1")
     query_latest_item()
@@ -38,28 +38,36 @@ class MapDynamoDBQuery:
         # Use the existing GSI
         self.gsi_name = 'tile-tsver-index'
 
-    def get_latest_element_versions_optimized(self, tile, max_tsver, batch_size=100):
+    def get_latest_element_versions_optimized(self, tile, max_tsver, batch_size=100, expected_elements=None):
         """
         Optimized version that processes results in batches to reduce memory usage
-        for tiles with many elements or versions
+        for tiles with many elements or versions.
+
+        If the caller knows how many distinct elements the tile has, pass it as
+        expected_elements: paging stops once that many have been seen, so the cost is
+        bounded by the pages holding each element's latest version rather than by
+        every version in the tile.
         """
         logger.info(f"Querying latest element versions for tile: {tile} with max_tsver: {max_tsver}")
         start_time = time.time()
         
         try:
-            latest_versions = {}
+            # Elements already seen, and (element, tsver) for each first sighting
+            seen_elements = set()
+            latest_versions = []
             last_evaluated_key = None
             total_items_processed = 0
             
+            # Built once; only ExclusiveStartKey changes between pages
+            query_params = {
+                'IndexName': self.gsi_name,
+                'KeyConditionExpression': Key('tile').eq(tile) & Key('tsver').lte(max_tsver),
+                'ScanIndexForward': False,  # Get items in descending order by tsver
+                'Limit': batch_size
+            }
+
             # Process in batches
             while True:
-                query_params = {
-                    'IndexName': self.gsi_name,
-                    'KeyConditionExpression': Key('tile').eq(tile) & Key('tsver').lte(max_tsver),
-                    'ScanIndexForward': False,  # Get items in descending order by tsver
-                    'Limit': batch_size
-                }
-                
                 if last_evaluated_key:
                     query_params['ExclusiveStartKey'] = last_evaluated_key
                 
@@ -70,24 +78,24 @@ class MapDynamoDBQuery:
                 
                 # Process this batch
                 for item in items:
-                    element = item.get('element')
-                    tsver = item.get('tsver')
-                    
-                    if element not in latest_versions:
-                        latest_versions[element] = {
-                            'element': element,
-                            'max_tsver': tsver
-                        }
+                    element = item['element']
+                    if element not in seen_elements:
+                        seen_elements.add(element)
+                        latest_versions.append((element, item['tsver']))
                 
                 last_evaluated_key = response.get('LastEvaluatedKey')
                 
                 logger.info(f"Processed batch of {len(items)} items, found {len(latest_versions)} unique elements so far")
-                
+
+                # Every element's latest version has been seen, the remaining pages can be skipped
+                if expected_elements and len(seen_elements) >= expected_elements:
+                    break
+
                 if not last_evaluated_key:
                     break
             
             # Convert to list of results
-            final_results = list(latest_versions.values())
+            final_results = [{'element': element, 'max_tsver': tsver} for element, tsver in latest_versions]
             
             elapsed_time = time.time() - start_time
             logger.info(f"Query completed in {elapsed_time:.2f} seconds")
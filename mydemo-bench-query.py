@@ -5,10 +5,14 @@ from concurrent.futures import ThreadPoolExecutor
 import threading
 from botocore.config import Config
 
+# Worker threads sharing the client; the connection pool is sized to match
+num_threads = 256
+
 # Configure boto3 for maximum performance
 config = Config(
     retries={'max_attempts': 10, 'mode': 'adaptive'},
-    max_pool_connections=50
+    max_pool_connections=num_threads,
+    tcp_keepalive=True
 )
 
 # Initialize DynamoDB client
@@ -16,82 +20,112 @@ dynamodb = boto3.resource('dynamodb', region_name='us-east-1', config=config)
 table = dynamodb.Table('mydemo')
 client = boto3.client('dynamodb', region_name='us-east-1', config=config)
 
-# List to hold oneids and types
-items = []
+# Only the key attributes are read back
+PROJECTION_EXPRESSION = 'oneid, #t'
+PROJECTION_NAMES = {'#t': 'type'}
+
+# BatchGetItem keys for the scanned items, built once so query_batch only samples them
+item_keys = []
 
-# Shared variables for tracking total queries and items
-total_queries = 0
-total_items = 0
-total_errors = 0
+# Guards the set of scanned keys while the scan segments add to it
 lock = threading.Lock()
 
-def scan_table(target_size=1000000):
-    print("Scanning table...")
+def scan_segment(segment, total_segments, target_size, stop_event, seen):
+    # Each segment worker gets its own session; boto3 resources aren't thread-safe
+    session = boto3.session.Session()
+    segment_table = session.resource('dynamodb', region_name='us-east-1', config=config).Table(table.name)
     scan_kwargs = {
-        'ProjectionExpression': 'oneid, #t',
-        'ExpressionAttributeNames': {'#t': 'type'},
-        'Limit': 1000
+        'ProjectionExpression': PROJECTION_EXPRESSION,
+        'ExpressionAttributeNames': PROJECTION_NAMES,
+        'Limit': 1000,
+        'TotalSegments': total_segments,
+        'Segment': segment
     }
     last_evaluated_key = None
 
-    while len(items) < target_size:
+    while not stop_event.is_set():
         if last_evaluated_key:
             scan_kwargs['ExclusiveStartKey'] = last_evaluated_key
 
-        response = table.scan(**scan_kwargs)
-        items.extend([{'oneid': item['oneid'], 'type': item['type']} for item in response['Items']])
+        response = segment_table.scan(**scan_kwargs)
+        with lock:
+            # Deduplicate on (oneid, type) while scanning
+            for item in response['Items']:
+                seen.add((item['oneid'], item['type']))
+            if len(seen) >= target_size:
+                stop_event.set()
         last_evaluated_key = response.get('LastEvaluatedKey')
 
         if not last_evaluated_key:
             break
 
-    # Remove duplicates while preserving order
-    items[:] = list({(item['oneid'], item['type']): item for item in items}.values())
-    print(f"Scan complete. Total unique items: {len(items)}")
+def scan_table(target_size=1000000, total_segments=16):
+    print(f"Scanning table with {total_segments} parallel segments...")
+    stop_event = threading.Event()
+    seen = set()
+
+    with ThreadPoolExecutor(max_workers=total_segments) as executor:
+        futures = [executor.submit(scan_segment, segment, total_segments, target_size, stop_event, seen)
+                   for segment in range(total_segments)]
+        for future in futures:
+            future.result()
+
+    item_keys[:] = [{'oneid': {'S': oneid}, 'type': {'S': item_type}} for oneid, item_type in seen]
+    print(f"Scan complete. Total unique items: {len(item_keys)}")
 
 def query_batch(batch_size=100):
-    global total_queries, total_items, total_errors
-    batch = random.sample(items, min(batch_size, len(items)))
+    # Sampled without replacement, since BatchGetItem rejects duplicate keys
+    batch = random.sample(item_keys, min(batch_size, len(item_keys)))
     try:
         response = client.batch_get_item(
             RequestItems={
                 table.name: {
-                    'Keys': [{'oneid': {'S': item['oneid']}, 'type': {'S': item['type']}} for item in batch],
-                    'ProjectionExpression': 'oneid, #t',
-                    'ExpressionAttributeNames': {'#t': 'type'}
+                    'Keys': batch,
+                    'ProjectionExpression': PROJECTION_EXPRESSION,
+                    'ExpressionAttributeNames': PROJECTION_NAMES
                 }
             }
         )
-        with lock:
-            total_queries += len(batch)
-            total_items += len(response['Responses'][table.name])
+        return len(batch), len(response['Responses'][table.name]), 0
     except Exception as e:
-        with lock:
-            total_errors += len(batch)
         print(f"Error in batch query: {str(e)}")
+        return 0, 0, len(batch)
+
+def worker(end_time):
+    # Counters stay local to the thread and are summed once the run ends
+    queries = retrieved = errors = 0
+    while time.time() < end_time:
+        batch_queries, batch_items, batch_errors = query_batch()
+        queries += batch_queries
+        retrieved += batch_items
+        errors += batch_errors
+    return queries, retrieved, errors
 
 def run_benchmark(duration, num_threads):
+    # Each worker runs for the whole duration instead of resubmitting tasks per round
+    end_time = time.time() + duration
     with ThreadPoolExecutor(max_workers=num_threads) as executor:
-        end_time = time.time() + duration
-        while time.time() < end_time:
-            futures = [executor.submit(query_batch) for _ in range(num_threads)]
-            for future in futures:
-                future.result()
+        futures = [executor.submit(worker, end_time) for _ in range(num_threads)]
+        results = [future.result() for future in futures]
+
+    total_queries = sum(result[0] for result in results)
+    total_items = sum(result[1] for result in results)
+    total_errors = sum(result[2] for result in results)
+    return total_queries, total_items, total_errors
 
 # Scan the table first
 scan_table()
 
-if not items:
+if not item_keys:
     print("No items found. Exiting.")
     exit()
 
 # Run benchmark
 print("Starting benchmark...")
-num_threads = 2000  # Adjust based on your needs
 duration = 600  # 10 minutes
 
 start_time = time.time()
-run_benchmark(duration, num_threads)
+total_queries, total_items, total_errors = run_benchmark(duration, num_threads)
 end_time = time.time()
 
 # Calculate and print results
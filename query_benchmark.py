@@ -5,73 +5,108 @@ from concurrent.futures import ThreadPoolExecutor
 from botocore.config import Config
 import threading
 
-# Configure boto3 for maximum performance
+# Number of worker threads; each one gets its own client
+num_threads = 256
+
+# Configure boto3 for maximum performance; a worker issues one request at a time,
+# so its client only needs a couple of pooled connections
 config = Config(
     retries={'max_attempts': 10, 'mode': 'adaptive'},
-    max_pool_connections=100
+    max_pool_connections=2,
+    tcp_keepalive=True
 )
 
-# Initialize DynamoDB client
+# Initialize DynamoDB table (used for its name)
 dynamodb = boto3.resource('dynamodb', region_name='us-east-1', config=config)
 table = dynamodb.Table('mydemo')
-client = boto3.client('dynamodb', region_name='us-east-1', config=config)
 
-# File to read items from
-ITEMS_FILE = 'dynamodb_items.json'
+# File to read items from, one JSON object per line (written by scan_and_save.py)
+ITEMS_FILE = 'dynamodb_items.ndjson'
+
+# Only the key attributes are read back
+PROJECTION_EXPRESSION = 'oneid, #t'
+PROJECTION_NAMES = {'#t': 'type'}
 
-# Thread-local storage for performance metrics
+# Per-thread boto3 clients
 thread_local = threading.local()
 
+def get_client():
+    """Get this thread's client, created on first use so no connection pool is shared across threads"""
+    if not hasattr(thread_local, 'client'):
+        session = boto3.session.Session()
+        thread_local.client = session.client('dynamodb', region_name='us-east-1', config=config)
+    return thread_local.client
+
 def load_items():
     with open(ITEMS_FILE, 'r') as f:
-        return json.load(f)
+        for line in f:
+            yield json.loads(line)
 
 def split_items(items, num_threads):
-    items_per_thread = len(items) // num_threads
-    return [items[i:i + items_per_thread] for i in range(0, len(items), items_per_thread)]
-
-def query_batch(items, start_index, batch_size=100):
-    end_index = min(start_index + batch_size, len(items))
-    batch = items[start_index:end_index]
+    # Shard on the partition key so each worker owns a disjoint set of oneids
+    # and any throttling retries stay within that worker's shard
+    shards = [[] for _ in range(num_threads)]
+    for item in items:
+        shards[hash(item['oneid']['S']) % num_threads].append(item)
+    return [shard for shard in shards if shard]
+
+def query_batch(item_keys, start_index, batch_size=100):
+    end_index = min(start_index + batch_size, len(item_keys))
+    batch = item_keys[start_index:end_index]
     try:
-        response = client.batch_get_item(
+        response = get_client().batch_get_item(
             RequestItems={
                 table.name: {
-                    'Keys': [{'oneid': {'S': item['oneid']}, 'type': {'S': item['type']}} for item in batch],
-                    'ProjectionExpression': 'oneid, #t',
-                    'ExpressionAttributeNames': {'#t': 'type'}
+                    'Keys': batch,
+                    'ProjectionExpression': PROJECTION_EXPRESSION,
+                    'ExpressionAttributeNames': PROJECTION_NAMES
                 }
             }
         )
-        retrieved_items = len(response['Responses'][table.name])
-        if not hasattr(thread_local, 'stats'):
-            thread_local.stats = {'queries': 0, 'items': 0, 'errors': 0}
-        thread_local.stats['queries'] += len(batch)
-        thread_local.stats['items'] += retrieved_items
+        return end_index, len(batch), len(response['Responses'][table.name]), 0
     except Exception as e:
-        if not hasattr(thread_local, 'stats'):
-            thread_local.stats = {'queries': 0, 'items': 0, 'errors': 0}
-        thread_local.stats['errors'] += len(batch)
         print(f"Error in batch query: {str(e)}")
-    return end_index
+        return end_index, 0, 0, len(batch)
 
-def worker(items, end_time):
+def worker(items, stop_event, ready):
+    # Create this thread's client and open its connection before the timed run starts
+    query_batch(items, 0)
+    ready.wait()
+
+    # Counters stay local to the thread and are summed once the run ends
+    queries = retrieved = errors = 0
     start_index = 0
-    while time.time() < end_time:
-        start_index = query_batch(items, start_index)
+    while not stop_event.is_set():
+        start_index, batch_queries, batch_items, batch_errors = query_batch(items, start_index)
+        queries += batch_queries
+        retrieved += batch_items
+        errors += batch_errors
         if start_index >= len(items):
             start_index = 0  # Reset to beginning if we've reached the end
+    return queries, retrieved, errors
 
 def run_benchmark(item_chunks, duration, num_threads):
-    end_time = time.time() + duration
+    stop_event = threading.Event()
+    ready = threading.Barrier(len(item_chunks) + 1)
     with ThreadPoolExecutor(max_workers=num_threads) as executor:
-        futures = [executor.submit(worker, chunk, end_time) for chunk in item_chunks]
-        for future in futures:
-            future.result()
+        futures = [executor.submit(worker, chunk, stop_event, ready) for chunk in item_chunks]
+
+        # Start timing once every worker has warmed up its connection
+        ready.wait()
+        start_time = time.time()
+        time.sleep(duration)
+        stop_event.set()
+        results = [future.result() for future in futures]
+        total_time = time.time() - start_time
+
+    total_queries = sum(result[0] for result in results)
+    total_items = sum(result[1] for result in results)
+    total_errors = sum(result[2] for result in results)
+    return total_queries, total_items, total_errors, total_time
 
 if __name__ == "__main__":
-    # Load items from file
-    items = load_items()
+    # Load items from file, converted once into BatchGetItem keys
+    items = [{'oneid': {'S': item['oneid']}, 'type': {'S': item['type']}} for item in load_items()]
 
     if not items:
         print("No items found. Make sure to run scan_and_save.py first.")
@@ -81,23 +116,14 @@ if __name__ == "__main__":
 
     # Run benchmark
     print("Starting benchmark...")
-    num_threads = 2000  # Adjust based on your needs
     duration = 600  # 10 minutes
 
     # Split items among threads
     item_chunks = split_items(items, num_threads)
 
-    start_time = time.time()
-    run_benchmark(item_chunks, duration, num_threads)
-    end_time = time.time()
-
-    # Aggregate results
-    total_queries = sum(getattr(thread, 'stats', {}).get('queries', 0) for thread in threading.enumerate())
-    total_items = sum(getattr(thread, 'stats', {}).get('items', 0) for thread in threading.enumerate())
-    total_errors = sum(getattr(thread, 'stats', {}).get('errors', 0) for thread in threading.enumerate())
+    total_queries, total_items, total_errors, total_time = run_benchmark(item_chunks, duration, num_threads)
 
     # Calculate and print results
-    total_time = end_time - start_time
     requests_per_second = total_queries / total_time
 
     print(f"\nBenchmark completed:")
@@ -1,5 +1,7 @@
 import boto3
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from botocore.config import Config
 
 # Configure boto3
@@ -12,38 +14,57 @@ config = Config(
 dynamodb = boto3.resource('dynamodb', region_name='us-east-1', config=config)
 table = dynamodb.Table('mydemo')
 
-# File to store items
-ITEMS_FILE = 'dynamodb_items.json'
+# File to store items, one JSON object per line
+ITEMS_FILE = 'dynamodb_items.ndjson'
 
-def scan_and_save_items(target_size=1000000):
-    print("Scanning table and saving items...")
-    items = []
+# Guards the seen keys and the output file while the scan segments add to them
+lock = threading.Lock()
+
+def scan_segment(segment, total_segments, target_size, stop_event, seen, out):
+    # Each segment worker gets its own session; boto3 resources aren't thread-safe
+    session = boto3.session.Session()
+    segment_table = session.resource('dynamodb', region_name='us-east-1', config=config).Table(table.name)
     scan_kwargs = {
         'ProjectionExpression': 'oneid, #t',
         'ExpressionAttributeNames': {'#t': 'type'},
-        'Limit': 1000
+        'Limit': 1000,
+        'TotalSegments': total_segments,
+        'Segment': segment
     }
     last_evaluated_key = None
 
-    while len(items) < target_size:
+    while not stop_event.is_set():
         if last_evaluated_key:
             scan_kwargs['ExclusiveStartKey'] = last_evaluated_key
 
-        response = table.scan(**scan_kwargs)
-        items.extend([{'oneid': item['oneid'], 'type': item['type']} for item in response['Items']])
+        response = segment_table.scan(**scan_kwargs)
+        with lock:
+            # Deduplicate on (oneid, type) and write new items out as they arrive
+            for item in response['Items']:
+                key = (item['oneid'], item['type'])
+                if key not in seen:
+                    seen.add(key)
+                    out.write(json.dumps(item) + '\n')
+            if len(seen) >= target_size:
+                stop_event.set()
         last_evaluated_key = response.get('LastEvaluatedKey')
 
         if not last_evaluated_key:
             break
 
-    # Remove duplicates while preserving order
-    items = list({(item['oneid'], item['type']): item for item in items}.values())
-    print(f"Scan complete. Total unique items: {len(items)}")
+def scan_and_save_items(target_size=1000000, total_segments=16):
+    print(f"Scanning table with {total_segments} parallel segments and saving items...")
+    stop_event = threading.Event()
+    seen = set()
 
-    # Save items to file
-    with open(ITEMS_FILE, 'w') as f:
-        json.dump(items, f)
+    # Items are streamed to the file during the scan instead of being held in memory
+    with open(ITEMS_FILE, 'w') as out, ThreadPoolExecutor(max_workers=total_segments) as executor:
+        futures = [executor.submit(scan_segment, segment, total_segments, target_size, stop_event, seen, out)
+                   for segment in range(total_segments)]
+        for future in futures:
+            future.result()
 
+    print(f"Scan complete. Total unique items: {len(seen)}")
     print(f"Items saved to {ITEMS_FILE}")
 
 if __name__ == "__main__":
@@ -1,26 +1,51 @@
 import boto3
+import os
 import random
 import string
+import threading
 import time
+from botocore.config import Config
 from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 
-# Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-table = dynamodb.Table('logdemo')
+NUM_THREADS = 128
+
+BOTO_CONFIG = Config(
+    retries={'max_attempts': 10, 'mode': 'adaptive'},
+    tcp_keepalive=True
+)
+
+thread_local = threading.local()
+
+def get_table():
+    """Get this thread's table; boto3 resources aren't thread-safe"""
+    if not hasattr(thread_local, 'table'):
+        dynamodb = boto3.session.Session().resource('dynamodb', region_name='us-east-1', config=BOTO_CONFIG)
+        thread_local.table = dynamodb.Table('logdemo')
+    return thread_local.table
+
+ADDRESS_CHARS = string.ascii_letters + string.digits
+EVENT_TYPES = ['SWAP', 'ADD_LIQUIDITY', 'REMOVE_LIQUIDITY']
+
+# Characters drawn per item: seven 44-character addresses, then 'amm' and 'extra'
+ADDRESS_LENGTH = 44
+AMM_OFFSET = 7 * ADDRESS_LENGTH
+EXTRA_OFFSET = AMM_OFFSET + 10
+ITEM_CHARS = EXTRA_OFFSET + 100
 
 # Helper functions
 def generate_account_address():
-    return ''.join(random.choices(string.ascii_letters + string.digits, k=44))
+    return ''.join(random.choices(ADDRESS_CHARS, k=44))
 
 def generate_event_type():
-    return random.choice(['SWAP', 'ADD_LIQUIDITY', 'REMOVE_LIQUIDITY'])
+    return random.choice(EVENT_TYPES)
 
 def generate_block_time():
     return int(time.time() * 1000000)  # Microseconds
 
 def generate_volume():
-    return Decimal(str(random.uniform(-10, 10)))
+    # Built from an integer count of millionths, skipping the float -> str -> Decimal parse
+    return Decimal(random.randint(-10000000, 10000000)).scaleb(-6)
 
 # Generate a list of large accounts
 LARGE_ACCOUNTS = [generate_account_address() for _ in range(5)]  # 5 large accounts
@@ -35,10 +60,14 @@ print("Large account information has been written to 'large_accounts.txt'")
 
 # Function to create a single item
 def create_item(i):
+    # Draw all of the item's random characters in one call and slice them up
+    chars = ''.join(random.choices(ADDRESS_CHARS, k=ITEM_CHARS))
+    addresses = [chars[j:j + ADDRESS_LENGTH] for j in range(0, AMM_OFFSET, ADDRESS_LENGTH)]
+
     if i % 2 == 0:  # Every 2nd item will be for a large account
         account_address = LARGE_ACCOUNTS[i % len(LARGE_ACCOUNTS)]
     else:
-        account_address = generate_account_address()
+        account_address = addresses[6]
 
     # Random block_number for all accounts within int range
     block_number = random.randint(0, 2**31 - 1)  # 0 to max value for 32-bit signed integer
@@ -49,23 +78,23 @@ def create_item(i):
         'event_id': i,
         'date': f"2023-{random.randint(1, 12):02d}-{random.randint(1, 28):02d}",
         'event_type': generate_event_type(),
-        'token_account_address': generate_account_address(),
-        'token_address': generate_account_address(),
-        'opponent_address': generate_account_address(),
-        'opponent_token_account_address': generate_account_address(),
-        'tx_hash': ''.join(random.choices(string.hexdigits, k=64)),
+        'token_account_address': addresses[0],
+        'token_address': addresses[1],
+        'opponent_address': addresses[2],
+        'opponent_token_account_address': addresses[3],
+        'tx_hash': os.urandom(32).hex(),
         'block_time': generate_block_time(),
         'seq': str(random.randint(1, 1000000)),
         'amount': str(random.uniform(0, 1000)),
         'flag': random.randint(0, 1),
-        'amm': ''.join(random.choices(string.ascii_lowercase, k=10)),
+        'amm': chars[AMM_OFFSET:EXTRA_OFFSET],
         'flow_type': random.randint(0, 2),
         'balance_after': str(random.uniform(0, 10000)),
         'token_price_u': str(random.uniform(0, 100)),
-        'contract': generate_account_address(),
-        'pair_address': generate_account_address(),
+        'contract': addresses[4],
+        'pair_address': addresses[5],
         'volume': generate_volume(),
-        'extra': ''.join(random.choices(string.ascii_letters, k=100)),
+        'extra': chars[EXTRA_OFFSET:],
         'is_target': random.choice([True, False]),
         'tx_seq': random.randint(1, 1000),
         'profit': str(random.uniform(-100, 100))
@@ -73,7 +102,7 @@ def create_item(i):
 
 # Function to insert items in batches
 def insert_items(start, end):
-    with table.batch_writer() as batch:
+    with get_table().batch_writer() as batch:
         for i in range(start, end):
             item = create_item(i)
             batch.put_item(Item=item)
@@ -83,9 +112,8 @@ def insert_items(start, end):
 def main():
     total_items = 300000000
     batch_size = 100000
-    num_threads = 10
 
-    with ThreadPoolExecutor(max_workers=num_threads) as executor:
+    with ThreadPoolExecutor(max_workers=NUM_THREADS) as executor:
         for i in range(0, total_items, batch_size):
             executor.submit(insert_items, i, min(i + batch_size, total_items))
 
@@ -1,11 +1,36 @@
 import boto3
+import heapq
+import threading
 from boto3.dynamodb.conditions import Key, Attr
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 import time
 
-# Initialize DynamoDB client
-dynamodb = boto3.resource('dynamodb', region_name='us-east-1')
-table = dynamodb.Table('logdemo')
+thread_local = threading.local()
+
+def get_table():
+    """Get this thread's table; boto3 resources aren't thread-safe"""
+    if not hasattr(thread_local, 'table'):
+        dynamodb = boto3.session.Session().resource('dynamodb', region_name='us-east-1')
+        thread_local.table = dynamodb.Table('logdemo')
+    return thread_local.table
+
+def run_query(query_params):
+    return get_table().query(**query_params)
+
+def build_table(ready):
+    get_table()
+    ready.wait()
+
+# Both queries run on these two threads, each with its own table
+executor = ThreadPoolExecutor(max_workers=2)
+
+def warm_up():
+    """Build each executor thread's session and table so query_items' timing excludes that setup"""
+    # The barrier holds each task until the other starts, so both threads are created
+    ready = threading.Barrier(2)
+    for future in [executor.submit(build_table, ready) for _ in range(2)]:
+        future.result()
 
 def query_items():
     account_address = "YxwtfP01ogbCZA4yMBg3cKu94A3tZMsKg2GxDOvL3nTA"
@@ -24,6 +49,8 @@ def query_items():
 
     event_types = ['SWAP', 'ADD_LIQUIDITY', 'REMOVE_LIQUIDITY', 'TRANSFER', 'MINT', 'BURN']
 
+    warm_up()
+
     try:
         start_time = time.time()
         items = []
@@ -37,8 +64,6 @@ def query_items():
             'ScanIndexForward': False,
             'Limit': limit
         }
-        response1 = table.query(**query_params1)
-        items.extend(response1['Items'])
 
         # Second query
         query_params2 = {
@@ -49,12 +74,17 @@ def query_items():
             'ScanIndexForward': False,
             'Limit': limit
         }
-        response2 = table.query(**query_params2)
-        items.extend(response2['Items'])
 
-        # Sort and limit the combined results
-        items.sort(key=lambda x: (-int(x['block_number']), -int(x['event_id'])))
-        items = items[:limit]
+        # Both queries are independent, so issue them concurrently
+        future1 = executor.submit(run_query, query_params1)
+        future2 = executor.submit(run_query, query_params2)
+        items.extend(future1.result()['Items'])
+        items.extend(future2.result()['Items'])
+
+        # Pick the top 'limit' combined results, converting each Decimal once up front
+        sort_keys = [(-int(item['block_number']), -int(item['event_id']), i) for i, item in enumerate(items)]
+        sort_keys = heapq.nsmallest(limit, sort_keys)
+        items = [items[i] for _, _, i in sort_keys]
 
         end_time = time.time()
         execution_time = end_time - start_time
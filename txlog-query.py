@@ -1,4 +1,5 @@
 import boto3
+import heapq
 from boto3.dynamodb.conditions import Key, Attr
 from decimal import Decimal
 import time
@@ -18,15 +19,15 @@ def query_items():
         items = []
         last_evaluated_key = None
 
-        while len(items) < limit:
-            # Query parameters
-            query_params = {
-                'KeyConditionExpression': Key('account_address').eq(account_address),
-                'FilterExpression': Attr('event_type').is_in(event_types) & Attr('volume').gte(volume_threshold),
-                'ScanIndexForward': False,  # This will sort block_number in descending order
-                'Limit': limit  # This limits the items per query, not the final result
-            }
+        # Built once; only ExclusiveStartKey changes between pages
+        query_params = {
+            'KeyConditionExpression': Key('account_address').eq(account_address),
+            'FilterExpression': Attr('event_type').is_in(event_types) & Attr('volume').gte(volume_threshold),
+            'ScanIndexForward': False,  # This will sort block_number in descending order
+            'Limit': limit  # This limits the items per query, not the final result
+        }
 
+        while len(items) < limit:
             if last_evaluated_key:
                 query_params['ExclusiveStartKey'] = last_evaluated_key
 
@@ -43,11 +44,11 @@ def query_items():
             if len(items) >= limit:
                 break
 
-        # Sort items by block_number (desc) and then by event_id (desc)
-        items.sort(key=lambda x: (-int(x['block_number']), -int(x['event_id'])))
-
-        # Ensure we only return 'limit' number of items
-        items = items[:limit]
+        # Take the top 'limit' items by block_number (desc) and then by event_id (desc),
+        # converting each Decimal once up front and selecting (key, index) tuples
+        sort_keys = [(-int(item['block_number']), -int(item['event_id']), i) for i, item in enumerate(items)]
+        sort_keys = heapq.nsmallest(limit, sort_keys)
+        items = [items[i] for _, _, i in sort_keys]
 
         end_time = time.time()
         execution_time = end_time - start_time